@@ -1,108 +1,179 @@
-import importlib, urllib.request, json, ssl
-
-import importlib
-import urllib.request
 import json
-import ssl
+import os
+import time
+import asyncio
+import collections
+import functools
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from tenacity import (
-    retry,
-    stop_after_attempt,  # Added for limiting retry attempts
-    wait_exponential,  # Changed from wait_fixed to wait_exponential
-    wait_fixed
-)
+import httpx
+
+from .retry_policy import APIError, CircuitBreaker, RetryPolicy, parseRetryAfter
 
 gpt_250 = 'fd141762ad904a91b170781fcb428b04'  # GPT-4 enabled
 
-def endUrl(deployment, api,
-           base='https://apigw.rand.org/openai/RAND/inference/deployments/', 
+api = '2024-06-01'  # Updated 10/15/24
+
+# Gateway root; override (or set GPT_RAND_BASE_URL) to point at a mock server
+BASE_URL = os.environ.get('GPT_RAND_BASE_URL',
+                          'https://apigw.rand.org/openai/RAND/inference/deployments/')
+
+Deployment = {
+    '3': 'gpt-35-turbo-v0125-base',
+    '4': 'gpt-4-v0613-base',
+    '4o': 'gpt-4o-2024-08-06',
+    '4om': 'gpt-4o-mini-2024-07-18',
+}
+
+Model = {
+    '3': 'gpt-35-turbo',
+    '4': 'gpt-4',
+    '4o': 'gpt-4o',
+    '4om': 'gpt-4o-mini',
+}
+
+# Optional metrics sink, e.g. metrics.Metrics; anything with observe() and incr()
+metrics = None
+
+# Retry policy and circuit breaker shared by every GPT call; replace or retune before a run
+policy = RetryPolicy()
+breaker = CircuitBreaker()
+
+def _observe(stage, seconds, **fields):
+    if metrics is not None:
+        metrics.observe(stage, seconds, **fields)
+
+def _incr(name, n=1):
+    if metrics is not None:
+        metrics.incr(name, n)
+
+def _recordUsage(res):
+    '''Counts prompt/completion tokens from the response `usage` field'''
+    usage = res.get('usage') or {}
+    _incr('gpt_requests')
+    _incr('gpt_prompt_tokens', usage.get('prompt_tokens', 0))
+    _incr('gpt_completion_tokens', usage.get('completion_tokens', 0))
+
+def _beforeSleep(name):
+    '''tenacity before_sleep hook counting retries and time spent in backoff'''
+    def hook(retry_state):
+        _incr(f'{name}_retries')
+        _incr(f'{name}_backoff_seconds', retry_state.next_action.sleep)
+    return hook
+
+def endUrl(deployment, api, base=None,
            method='/chat/completions?api-version='):
-    return base + deployment + method + api
+    return (base or BASE_URL) + deployment + method + api
 
-def sendRequest(url, hdr, data):
-    data = json.dumps(data)
-    context = ssl._create_unverified_context()
-    req = urllib.request.Request(url, headers=hdr, data=bytes(data.encode("utf-8")))
-    req.get_method = lambda: 'POST'
-    
+@functools.lru_cache(maxsize=None)
+def endpoint(GPT, base, version):
+    '''URL and headers for a deployment, built once per (model, gateway, api version)'''
+    url = endUrl(Deployment[GPT], version, base)
+    hdr = {
+        'Content-Type': 'application/json',
+        'Cache-Control': 'no-cache',
+        'Ocp-Apim-Subscription-Key': gpt_250,
+    }
+    return url, hdr
+
+def buildRequest(prompt, context='', t=1, c=1, GPT='4om', n=1):
+    '''Returns the (url, headers, body) for a chat-completions call; treat the headers as read-only'''
+    url, hdr = endpoint(GPT, BASE_URL, api)
+
+    data = {
+        'model': Model[GPT],
+        'messages': [
+            {'role': 'system', 'content': context},
+            {'role': 'user', 'content': prompt}],
+        'temperature': t,
+        'top_p': c,
+        'n': n,
+    }
+    return url, hdr, data
+
+# Keep-alive connections shared by every thread calling sendRequest
+pool_size = 16
+_client = None
+_client_lock = threading.Lock()
+
+def getClient():
+    '''Returns the shared, thread-safe httpx.Client, creating it with `pool_size` connections on first use'''
+    global _client
+    with _client_lock:
+        if _client is None:
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            _client = httpx.Client(limits=limits, verify=False)
+        return _client
+
+def setPoolSize(size):
+    '''Resizes the connection pool; the current client is closed and a new one made on next use'''
+    global pool_size, _client
+    with _client_lock:
+        pool_size = size
+        if _client is not None:
+            _client.close()
+            _client = None
+
+def sendRequest(url, hdr, data, timeout=10):
     try:
-        response = urllib.request.urlopen(req, context=context, timeout=10)  # Added timeout
-        content = bytes.decode(response.read(), 'utf-8')  # Return string value
-        return json.loads(content)
-    except urllib.error.URLError as e:  # Added specific error handling
-        print(f"Network error: {e}")
+        response = getClient().post(url, headers=hdr, content=json.dumps(data).encode('utf-8'), timeout=timeout)
+    except httpx.TransportError as e:  # Timeouts and connection failures
+        print(f"Network error: {e!r}")
         raise
     except Exception as e:  # General exception handling
         print(f"Unexpected error: {e}")
         raise
+    if response.status_code >= 400:  # Status and Retry-After decide whether to retry
+        print(f"HTTP error {response.status_code}: {response.text[:300]}")
+        raise APIError(response.status_code, parseRetryAfter(response.headers), response.text)
+    return json.loads(response.content)
 
-@retry(wait=wait_exponential(multiplier=1, min=2, max=7))#, stop=stop_after_attempt(5))  # Modified retry logic
-def Respond(prompt, context='', t=1, c=1, GPT='4om', n=1, print_rslt=False):
-    '''Makes text calls to RAND's internal GPT'''
+def Respond(prompt, context='', t=1, c=1, GPT='4om', n=1, print_rslt=False, timeout=10, attempts=None):
+    '''Makes text calls to RAND's internal GPT, paced by `limiter`, retried under `policy` and paused while `breaker` is open'''
 
-    key = gpt_250
-    try:
-        api = '2024-06-01'  # Updated 10/15/24
-        
-        Deployment = {
-            '3': 'gpt-35-turbo-v0125-base',
-            '4': 'gpt-4-v0613-base',
-            '4o': 'gpt-4o-2024-08-06',
-            '4om': 'gpt-4o-mini-2024-07-18',
-        }
-    
-        Model = {
-            '3': 'gpt-35-turbo',
-            '4': 'gpt-4',
-            '4o': 'gpt-4o',
-            '4om': 'gpt-4o-mini',
-        }
-        
-        deployment = Deployment[GPT]
-        model = Model[GPT]
-        
-        url = endUrl(deployment, api)
-        
-        hdr = {
-            'Content-Type': 'application/json',
-            'Cache-Control': 'no-cache',
-            'Ocp-Apim-Subscription-Key': key,
-        }
-        
-        data = {
-            'model': model,
-            'messages': [
-                {'role': 'system', 'content': context},
-                {'role': 'user', 'content': prompt}],
-            'temperature': t,
-            'top_p': c,
-            'n': n,
-        }
-        
-        res = sendRequest(url, hdr, data)
-        
-        Results = [res['choices'][i]['message']['content'] for i in range(n)]
-        if print_rslt:
-            for answer in Results:
-                print('#---------------------------------#')
-                print(answer)
-        return Results
-    except Exception as e:
-        print(e)
-        raise
+    url, hdr, data = buildRequest(prompt, context, t, c, GPT, n)
+    for attempt in policy.retrying(attempts, before_sleep=_beforeSleep('respond')):
+        with attempt:
+            # Budget the prompt plus a typical completion; corrected from `usage` below.
+            entry = limiter.acquire(estimate_tokens(prompt + context) + 256)
+            breaker.wait(policy.deadline)
+            try:
+                started = time.perf_counter()
+                try:
+                    res = sendRequest(url, hdr, data, timeout)
+                finally:
+                    _observe('gpt_request', time.perf_counter() - started, model=GPT)
+                breaker.record()
+                _recordUsage(res)
+                limiter.settle(entry, res)
 
-@retry(wait=wait_fixed(2))
-def Summarize(text, context = '',T = .3, C = 1, N = 1, print_rslt = False, GPT = '4om'): 
+                Results = [res['choices'][i]['message']['content'] for i in range(n)]
+            except BaseException as e:  # Cancellation too, so a half-open probe is never left claimed
+                breaker.record(e)
+                print(e)
+                raise
+    if print_rslt:
+        for answer in Results:
+            print('#---------------------------------#')
+            print(answer)
+    return Results
+
+context0 = 'You are a helpful assistent that carefully and completely: reads, thinks through, and executes tasks.'
+
+summary_context = 'For the following summarize this into one very short paragraph highlighting important ideas.'
+
+def Summarize(text, context = '',T = .3, C = 1, N = 1, print_rslt = False, GPT = '4om', timeout = 10): 
     
-    context0 = 'You are a helpful assistent that carefully and completely: reads, thinks through, and executes tasks.'
     #descriptions #triple
     if context == '':
-        context = 'For the following summarize this into one very short paragraph highlighting important ideas.'
+        context = summary_context
     
     request =  context
     prompt = text
 
-    answer = Respond(request + '\n' + prompt, context = context0, t = T, c = C, GPT = GPT, n = N)
+    answer = Respond(request + '\n' + prompt, context = context0, t = T, c = C, GPT = GPT, n = N, timeout = timeout)
     
     if print_rslt == True:
         for a in answer:
@@ -111,6 +182,301 @@ def Summarize(text, context = '',T = .3, C = 1, N = 1, print_rslt = False, GPT =
 
     return answer
 
+def estimate_tokens(text):
+    '''Rough token count (~4 characters per token) used for budgeting requests'''
+    return len(text) // 4 + 1
+
+batch_instructions = (
+    'Apply the instructions above to each of the {n} articles below separately. '
+    'Each article is wrapped in <article id="..."> tags. '
+    'Respond with only a JSON object mapping every article id (as a string) to its summary.'
+)
+
+def packByTokens(texts, budget, overhead=0):
+    '''Greedily groups text indices, in order, so each group's estimated tokens (plus overhead) fit the budget'''
+    groups, current, used = [], [], overhead
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text) + 10  # article tags
+        if current and used + tokens > budget:
+            groups.append(current)
+            current, used = [], overhead
+        current.append(i)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+def batchPrompt(texts, context=''):
+    '''Builds one prompt asking for a summary of every text, keyed by position'''
+    if context == '':
+        context = summary_context
+    articles = '\n'.join(f'<article id="{i + 1}">\n{text}\n</article>' for i, text in enumerate(texts))
+    return context + '\n' + batch_instructions.format(n=len(texts)) + '\n\n' + articles
+
+def parseBatch(answer, n):
+    '''Splits a batched answer back into n summaries; entries that are missing or malformed come back as None'''
+    start, end = answer.find('{'), answer.rfind('}')
+    try:
+        parsed = json.loads(answer[start:end + 1]) if start != -1 else {}
+    except ValueError:
+        parsed = {}
+    if not isinstance(parsed, dict):
+        parsed = {}
+    results = []
+    for i in range(n):
+        summary = parsed.get(str(i + 1))
+        results.append(summary.strip() if isinstance(summary, str) and summary.strip() else None)
+    return results
+
+def SummarizeBatch(texts, context='', T=.3, C=1, GPT='4om'):
+    '''Summarizes several texts in one request; unparseable entries come back as None for a single-text retry'''
+    answer = Respond(batchPrompt(texts, context), context=context0, t=T, c=C, GPT=GPT, n=1)
+    return parseBatch(answer[0], len(texts))
+
+class RateLimiter:
+    '''Sliding one-minute window limiting requests and tokens per minute, shared by sync and async callers on any thread'''
+
+    def __init__(self, rpm=None, tpm=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = collections.deque()  # [timestamp, tokens] per request
+        self.lock = threading.Lock()
+
+    def configure(self, rpm=None, tpm=None):
+        '''Sets new limits; requests already in the window keep counting against them'''
+        with self.lock:
+            self.rpm, self.tpm = rpm, tpm
+
+    def _reserve(self, tokens):
+        '''Claims room for a request if it fits now; returns (entry or None, seconds to wait before trying again)'''
+        with self.lock:
+            if self.rpm is None and self.tpm is None:
+                return None, 0
+            now = time.monotonic()
+            while self.window and now - self.window[0][0] >= 60:
+                self.window.popleft()
+            used = sum(entry[1] for entry in self.window)
+            rpm_ok = self.rpm is None or len(self.window) < self.rpm
+            tpm_ok = self.tpm is None or not self.window or used + tokens <= self.tpm
+            if rpm_ok and tpm_ok:
+                entry = [now, tokens]
+                self.window.append(entry)
+                return entry, 0
+            return None, max(0.01, 60 - (now - self.window[0][0]))
+
+    def acquire(self, tokens):
+        '''Blocks until a request of `tokens` fits in the window; returns its entry for `settle`'''
+        while True:
+            entry, wait = self._reserve(tokens)
+            if not wait:
+                return entry
+            time.sleep(wait)
+
+    async def acquireAsync(self, tokens):
+        '''Async counterpart of acquire'''
+        while True:
+            entry, wait = self._reserve(tokens)
+            if not wait:
+                return entry
+            await asyncio.sleep(wait)
+
+    def settle(self, entry, res):
+        '''Corrects a request's estimated tokens with the `usage` of its response'''
+        if entry is not None and 'usage' in res:
+            with self.lock:
+                entry[1] = res['usage'].get('total_tokens', entry[1])
+
+# Request and token budget shared by every GPT call, sync or async; set limits with limiter.configure(rpm, tpm)
+limiter = RateLimiter()
+
+async def RespondAsync(client, prompt, context='', t=1, c=1, GPT='4om', n=1, retries=None):
+    '''Async Respond over a shared httpx.AsyncClient, paced by `limiter` and retried per request under `policy`'''
+    url, hdr, data = buildRequest(prompt, context, t, c, GPT, n)
+    async for attempt in policy.asyncRetrying(retries, before_sleep=_beforeSleep('respond')):
+        with attempt:
+            # Budget the prompt plus a typical completion; corrected from `usage` below.
+            entry = await limiter.acquireAsync(estimate_tokens(prompt + context) + 256)
+            # Nothing may await between claiming a half-open probe here and the try below
+            await breaker.waitAsync(policy.deadline)
+            try:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, headers=hdr, json=data)
+                finally:
+                    _observe('gpt_request', time.perf_counter() - started, model=GPT)
+                if response.status_code >= 400:
+                    raise APIError(response.status_code, parseRetryAfter(response.headers), response.text)
+                res = response.json()
+            except BaseException as e:  # Cancellation too, so a half-open probe is never left claimed
+                breaker.record(e)
+                raise
+            breaker.record()
+            _recordUsage(res)
+            limiter.settle(entry, res)
+            return [res['choices'][i]['message']['content'] for i in range(n)]
+
+async def SummarizeAsync(client, text, context='', T=.3, C=1, N=1, GPT='4om', retries=None):
+    '''Async counterpart of Summarize'''
+    if context == '':
+        context = summary_context
+    return await RespondAsync(client, context + '\n' + text, context=context0, t=T, c=C,
+                              GPT=GPT, n=N, retries=retries)
+
+map_instructions = 'The text below is part {i} of {k} of one long article. Apply the instructions above to this part only.'
+
+reduce_instructions = (
+    'The texts below are summaries of consecutive parts of one long article, in order. '
+    'Merge them into a single summary that follows the instructions above, without repeating facts.'
+)
+
+def chunkText(text, max_tokens):
+    '''Splits text on paragraph boundaries into chunks of at most ~max_tokens; oversized paragraphs are cut by length'''
+    limit = max_tokens * 4  # characters, matching estimate_tokens
+    pieces = []
+    for paragraph in text.split('\n\n'):
+        while len(paragraph) > limit:
+            cut = paragraph.rfind(' ', 0, limit)
+            cut = cut if cut > 0 else limit
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        pieces.append(paragraph)
+    chunks, current = [], ''
+    for piece in pieces:
+        if current and estimate_tokens(current) + estimate_tokens(piece) > max_tokens:
+            chunks.append(current)
+            current = ''
+        current = current + '\n\n' + piece if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _chunkKey(prompt, T, C, GPT):
+    return 'chunk:' + hashlib.sha256(json.dumps([prompt, T, C, GPT]).encode('utf-8')).hexdigest()
+
+def SummarizeLong(text, context='', T=.3, C=1, GPT='4om', chunk_tokens=3000, max_workers=4,
+                  cache=None, attempts=None, timeout=60):
+    '''Map-reduce summary of a text too long for one request: chunks are summarized concurrently, then merged.
+    Partials that do not fit in chunk_tokens together are merged hierarchically, in groups, before the final merge.
+    With a cache (anything with get_summary/put_summary), chunk summaries survive a failed reduce.'''
+    if context == '':
+        context = summary_context
+
+    def respond(prompt):
+        return Respond(prompt, context=context0, t=T, c=C, GPT=GPT, n=1, timeout=timeout, attempts=attempts)
+
+    chunks = chunkText(text, chunk_tokens)
+    if len(chunks) == 1:
+        return respond(context + '\n' + text)
+
+    def summarizeCached(prompt):
+        key = _chunkKey(prompt, T, C, GPT)
+        if cache is not None:
+            cached = cache.get_summary(key)
+            if cached is not None:
+                return cached
+        summary = respond(prompt)[0]
+        if cache is not None:
+            cache.put_summary(key, summary)
+        return summary
+
+    def summarizeChunk(i):
+        return summarizeCached(context + '\n' + map_instructions.format(i=i + 1, k=len(chunks)) + '\n\n' + chunks[i])
+
+    def reducePrompt(parts):
+        merged = '\n\n'.join(f'Part {i + 1}:\n{part}' for i, part in enumerate(parts))
+        return context + '\n' + reduce_instructions + '\n\n' + merged
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        partials = list(executor.map(summarizeChunk, range(len(chunks))))
+        _incr('gpt_long_chunks', len(chunks))
+        # Partials too long for one request together are merged in consecutive groups, level by level
+        while len(partials) > 1 and estimate_tokens(reducePrompt(partials)) > chunk_tokens:
+            groups = groupParts(partials, chunk_tokens)
+            if len(groups) == 1:
+                break
+            # A lone trailing part moves up a level as it is
+            partials = list(executor.map(lambda group: summarizeCached(reducePrompt(group)) if len(group) > 1
+                                         else group[0], groups))
+            _incr('gpt_long_reduces', sum(1 for group in groups if len(group) > 1))
+
+    return respond(reducePrompt(partials))
+
+def groupParts(parts, max_tokens):
+    '''Splits consecutive parts into groups of at most ~max_tokens, each with at least two parts where possible'''
+    groups, current = [], []
+    for part in parts:
+        if len(current) > 1 and sum(estimate_tokens(p) for p in current + [part]) > max_tokens:
+            groups.append(current)
+            current = []
+        current.append(part)
+    if current:
+        groups.append(current)
+    return groups
+
+async def SummarizeBatchAsync(client, texts, context='', T=.3, C=1, GPT='4om', retries=None):
+    '''Async counterpart of SummarizeBatch'''
+    answer = await RespondAsync(client, batchPrompt(texts, context), context=context0, t=T, c=C,
+                                GPT=GPT, n=1, retries=retries)
+    return parseBatch(answer[0], len(texts))
+
+def SummarizeMany(texts, context='', T=.3, C=1, N=1, GPT='4om', max_in_flight=8,
+                  rpm=None, tpm=None, retries=None, timeout=60, on_done=None, batch_tokens=None):
+    '''Summarizes a batch concurrently; returns results in input order, with the exception in place of any failed item.
+    With batch_tokens (and N=1), short texts are packed into shared requests of up to that many estimated tokens.
+    rpm/tpm, if given, retune the shared `limiter`; its window carries over from earlier calls.'''
+
+    if rpm or tpm:
+        limiter.configure(rpm, tpm)
+
+    if batch_tokens and N == 1:
+        overhead = estimate_tokens(context0 + (context or summary_context) + batch_instructions)
+        groups = packByTokens(texts, batch_tokens, overhead)
+    else:
+        groups = [[i] for i in range(len(texts))]
+    results = [None] * len(texts)
+
+    async def run():
+        limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+        gate = asyncio.Semaphore(max_in_flight)
+        async with httpx.AsyncClient(limits=limits, timeout=timeout, verify=False) as client:
+
+            async def one(i):
+                async with gate:
+                    try:
+                        results[i] = await SummarizeAsync(client, texts[i], context, T, C, N, GPT, retries)
+                    except Exception as e:
+                        results[i] = e
+                    finally:
+                        if on_done is not None:
+                            on_done()
+
+            async def group(idxs):
+                if len(idxs) == 1:
+                    return await one(idxs[0])
+                async with gate:
+                    try:
+                        parsed = await SummarizeBatchAsync(client, [texts[i] for i in idxs], context, T, C, GPT,
+                                                           retries)
+                    except Exception as e:
+                        print(f"Batched request failed, falling back to single requests: {e}")
+                        parsed = [None] * len(idxs)
+                _incr('gpt_batched_articles', len(idxs))
+                fallback = []
+                for i, summary in zip(idxs, parsed):
+                    if summary is None:
+                        fallback.append(i)
+                        continue
+                    results[i] = [summary]
+                    if on_done is not None:
+                        on_done()
+                _incr('gpt_batch_fallbacks', len(fallback))
+                await asyncio.gather(*(one(i) for i in fallback))
+
+            await asyncio.gather(*(group(idxs) for idxs in groups))
+        return results
+
+    return asyncio.run(run())
+
 
 
 
@@ -0,0 +1,176 @@
+import asyncio
+import email.utils
+import socket
+import threading
+import time
+import urllib.error
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_random_exponential,
+)
+
+# Statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+class APIError(Exception):
+    '''HTTP error from the chat-completions endpoint, with any Retry-After hint in seconds'''
+
+    def __init__(self, status, retry_after=None, body=''):
+        super().__init__(f'HTTP {status}: {body[:300]}')
+        self.status = status
+        self.retry_after = retry_after
+        self.body = body
+
+def parseRetryAfter(headers):
+    '''Seconds to wait according to retry-after-ms / Retry-After headers, or None'''
+    if headers is None:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def isRetryable(e):
+    '''True for transient failures (network errors, timeouts, 429/5xx); False for fatal ones such as other 4xx'''
+    if isinstance(e, APIError):
+        return e.status in RETRYABLE_STATUSES or e.status >= 500
+    if isinstance(e, urllib.error.HTTPError):
+        return e.code in RETRYABLE_STATUSES or e.code >= 500
+    if isinstance(e, (urllib.error.URLError, socket.timeout, TimeoutError, ConnectionError,
+                      httpx.TransportError, CircuitOpenError)):
+        return True
+    # Truncated or malformed bodies from a struggling gateway
+    return isinstance(e, ValueError) and not isinstance(e, UnicodeError)
+
+class wait_retry_after:
+    '''tenacity wait: honors a server Retry-After hint (capped), else falls back to jittered exponential backoff'''
+
+    def __init__(self, fallback, cap):
+        self.fallback = fallback
+        self.cap = cap
+
+    def __call__(self, retry_state):
+        e = retry_state.outcome.exception() if retry_state.outcome else None
+        hint = getattr(e, 'retry_after', None)
+        if hint is not None:
+            return min(hint, self.cap)
+        return self.fallback(retry_state)
+
+class CircuitOpenError(Exception):
+    '''Raised when a caller would wait longer than allowed for the circuit to close'''
+
+class CircuitBreaker:
+    '''Shared breaker: after `threshold` consecutive transient failures every caller pauses for `reset_timeout`
+    seconds; then one probe is let through, and its success closes the circuit again.'''
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def delay(self):
+        '''Seconds the caller should pause before sending; 0 if it may go now'''
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+            if self.probing:
+                return min(1.0, self.reset_timeout)
+            self.probing = True
+            return 0.0
+
+    def wait(self, max_wait=None):
+        '''Blocks while the circuit is open'''
+        waited = 0.0
+        while True:
+            pause = self.delay()
+            if pause <= 0:
+                return
+            if max_wait is not None and waited + pause > max_wait:
+                raise CircuitOpenError(f'circuit open for another {pause:.1f}s')
+            time.sleep(pause)
+            waited += pause
+
+    async def waitAsync(self, max_wait=None):
+        '''Async counterpart of wait'''
+        waited = 0.0
+        while True:
+            pause = self.delay()
+            if pause <= 0:
+                return
+            if max_wait is not None and waited + pause > max_wait:
+                raise CircuitOpenError(f'circuit open for another {pause:.1f}s')
+            await asyncio.sleep(pause)
+            waited += pause
+
+    def record(self, e=None):
+        '''Records a call outcome; only transient failures count towards opening the circuit.
+        Any HTTP answer, even a fatal 4xx, shows the endpoint is up and closes it; other errors
+        (including cancellation) just free the half-open probe slot'''
+        with self.lock:
+            if e is None or isinstance(e, (APIError, urllib.error.HTTPError)) and not isRetryable(e):
+                self.failures = 0
+                self.opened_at = None
+                self.probing = False
+                return
+            if not isRetryable(e):
+                self.probing = False
+                return
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                if self.opened_at is None or self.probing:
+                    print(f'Circuit opened after {self.failures} failures; pausing requests for {self.reset_timeout}s')
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+class RetryPolicy:
+    '''Bounded retry settings for GPT calls: jittered exponential backoff (or Retry-After),
+    at most `max_attempts` tries and `deadline` seconds in total, retrying only transient errors'''
+
+    def __init__(self, max_attempts=6, deadline=180, base=1, cap=30):
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.base = base
+        self.cap = cap
+
+    def kwargs(self, max_attempts=None, before_sleep=None):
+        stop = stop_after_attempt(max_attempts or self.max_attempts)
+        if self.deadline is not None:
+            stop = stop | stop_after_delay(self.deadline)
+        return dict(
+            stop=stop,
+            wait=wait_retry_after(wait_random_exponential(multiplier=self.base, max=self.cap), self.cap),
+            retry=retry_if_exception(isRetryable),
+            before_sleep=before_sleep,
+            reraise=True,
+        )
+
+    def retrying(self, max_attempts=None, before_sleep=None):
+        return Retrying(**self.kwargs(max_attempts, before_sleep))
+
+    def asyncRetrying(self, max_attempts=None, before_sleep=None):
+        return AsyncRetrying(**self.kwargs(max_attempts, before_sleep))
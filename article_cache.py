@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ArticleCache:
+    """
+    On-disk cache for scraped article text and GPT summaries.
+
+    Articles are keyed by their cleaned URL; summaries by a hash of the article
+    text and every prompt/model setting that affects the output. Entries older
+    than `ttl` seconds are treated as misses, and the least recently used
+    entries are evicted once the cache holds more than `max_bytes` of text.
+    The SQLite file is safe to share between threads and processes.
+
+    Args:
+        path (str): SQLite file to open or create.
+        ttl (float or None): Seconds an entry stays valid; None for no expiry.
+        max_bytes (int or None): Size budget for cached text; None for no limit.
+    """
+
+    def __init__(self, path='Data/.cache/scrape_summ.sqlite', ttl=30 * 24 * 3600, max_bytes=512 * 1024 ** 2):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {kind: {'hits': 0, 'misses': 0} for kind in ('article', 'summary')}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' kind TEXT, key TEXT, value TEXT, created REAL, accessed REAL, size INTEGER,'
+            ' PRIMARY KEY (kind, key))')
+        self._db.execute('CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)')
+        self._db.commit()
+
+    @staticmethod
+    def summary_key(text, context, GPT, T, C):
+        """
+        Hash everything that determines a summary.
+
+        Args:
+            text (str): Article text.
+            context (str): Summarization prompt.
+            GPT (str): Model key passed to `respond.Summarize`.
+            T (float): Temperature.
+            C (float): Top-p.
+
+        Returns:
+            str: Hex digest identifying the summary.
+        """
+        payload = json.dumps([text, context, GPT, T, C], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _get(self, kind, key):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute('SELECT value, created FROM entries WHERE kind=? AND key=?',
+                                   (kind, key)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._db.execute('DELETE FROM entries WHERE kind=? AND key=?', (kind, key))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.stats[kind]['misses'] += 1
+                return None
+            self._db.execute('UPDATE entries SET accessed=? WHERE kind=? AND key=?', (now, kind, key))
+            self._db.commit()
+            self.stats[kind]['hits'] += 1
+            return row[0]
+
+    def _put(self, kind, key, value):
+        now = time.time()
+        with self._lock:
+            self._db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                             (kind, key, value, now, now, len(value.encode('utf-8'))))
+            self._db.commit()
+            self._evict()
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% of the budget so eviction does not run on every insert.
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        stale = []
+        for kind, key, size in self._db.execute('SELECT kind, key, size FROM entries ORDER BY accessed'):
+            stale.append((kind, key))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany('DELETE FROM entries WHERE kind=? AND key=?', stale)
+        self._db.commit()
+
+    def get_article(self, url):
+        """Return cached article text for a cleaned URL, or None."""
+        return self._get('article', url)
+
+    def put_article(self, url, text):
+        """Cache article text for a cleaned URL."""
+        self._put('article', url, text)
+
+    def fetched_at(self, url):
+        """Return when the cached article text for a cleaned URL was fetched, or None; not counted as a lookup."""
+        with self._lock:
+            row = self._db.execute('SELECT created FROM entries WHERE kind=? AND key=?',
+                                   ('article', url)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_summary(self, key):
+        """Return a cached summary for a `summary_key`, or None."""
+        return self._get('summary', key)
+
+    def put_summary(self, key, summary):
+        """Cache a summary under a `summary_key`."""
+        self._put('summary', key, summary)
+
+    def report(self):
+        """
+        Format the hit/miss counts for this run.
+
+        Returns:
+            str: One line per entry kind.
+        """
+        lines = []
+        for kind, counts in self.stats.items():
+            total = counts['hits'] + counts['misses']
+            rate = counts['hits'] / total if total else 0.0
+            label = 'articles' if kind == 'article' else 'summaries'
+            lines.append(f"[CACHE] {label}: {counts['hits']} hits, {counts['misses']} misses ({rate:.0%} hit rate)")
+        return '\n'.join(lines)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
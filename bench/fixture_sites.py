@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import html
+import http.server
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+# Domains with site-specific selectors in scrape_and_summ.site_selectors, plus a generic one for default_selectors
+SITE_CONTAINERS = {
+    'proquest.com': "div.display_record_text_copy",
+    'justice.gov': "div.field--name-body",
+    'cnn.com': "div.article__content",
+    'nytimes.com': "section[name='articleBody']",
+    'abcnews.go.com': "div.Article__Content",
+    'cbsnews.com': "div.article-content",
+    'washingtonpost.com': "article div[data-qa='article-body']",
+    'nbcnews.com': "div.article-body__content",
+    'foxnews.com': "div.article-body",
+    'apnews.com': "div.Article",
+    'usatoday.com': "div.gnt_ar_b",
+    'reuters.com': "div.article-body__content",
+    'theguardian.com': "div.article-body-commercial-selector",
+    'latimes.com': "div.article-body",
+    'npr.org': "div.storytext",
+    'wikipedia.org': "div.mw-parser-output",
+    'dailymail.co.uk': "div.article-text",
+    'nydailynews.com': "div.article-content",
+    'startribune.com': "div.article__body",
+    'example-news.com': "div.entry-content",
+}
+
+WORDS = ('police officers said the suspect was arrested after an incident near the downtown station on tuesday '
+         'witnesses reported shots fired and several people were taken to a local hospital for treatment while '
+         'investigators continued to search the area and asked residents to share any video footage').split()
+
+# Server-wide settings; change them between runs, e.g. fixture_sites.config['latency'] = 0.5
+config = dict(latency=0.05, jitter=0.02, js_fraction=0.0, js_delay_ms=800, paragraphs=8, words=60, images=0,
+              image_kb=200)
+
+
+def open_tags(css):
+    """
+    Build opening and closing HTML tags for a simple CSS selector chain.
+
+    Supports descendant chains of tag, .class, #id and [attr='value'] parts, enough for the selectors above.
+
+    Args:
+        css (str): Selector such as "article div[data-qa='article-body']".
+
+    Returns:
+        tuple: (opening tags, closing tags).
+    """
+    opening, closing = [], []
+    for part in css.split():
+        tag = re.match(r'[a-z0-9]*', part).group() or 'div'
+        classes = re.findall(r'\.([-\w]+)', part)
+        attrs = [f'class="{" ".join(classes)}"'] if classes else []
+        attrs += [f'id="{value}"' for value in re.findall(r'#([-\w]+)', part)]
+        attrs += [f'{name}="{value}"' for name, value in re.findall(r"\[([-\w]+)=['\"]?([^'\"\]]+)['\"]?\]", part)]
+        opening.append(f'<{tag} {" ".join(attrs)}>' if attrs else f'<{tag}>')
+        closing.insert(0, f'</{tag}>')
+    return ''.join(opening), ''.join(closing)
+
+
+def article_paragraphs(path):
+    """Deterministic fake article text for a URL path."""
+    rng = random.Random(hashlib.sha256(path.encode('utf-8')).hexdigest())
+    return [' '.join(rng.choice(WORDS) for _ in range(config['words'])).capitalize() + '.'
+            for _ in range(config['paragraphs'])]
+
+
+def render(path, js_delay_ms=None):
+    """
+    Render a fixture article page for a path of the form /www.<domain>/<slug>.
+
+    Args:
+        path (str): URL path.
+        js_delay_ms (int or None): If set, the paragraphs are inserted by a script after this many milliseconds.
+
+    Returns:
+        str: HTML document.
+    """
+    host = path.strip('/').split('/')[0]
+    domain = next((d for d in SITE_CONTAINERS if d in host), 'example-news.com')
+    start, end = open_tags(SITE_CONTAINERS[domain])
+    paragraphs = article_paragraphs(path)
+    nav = '<nav><p>Home</p><p>World</p></nav>'
+    # Page weight a browser downloads but the scraper never reads
+    nav += ''.join(f'<img src="/asset{html.escape(path)}-{k}.jpg">' for k in range(config['images']))
+    if js_delay_ms is None:
+        body = start + ''.join(f'<p>{html.escape(p)}</p>' for p in paragraphs) + end
+        return f'<html><head><title>{html.escape(path)}</title></head><body>{nav}{body}</body></html>'
+    container_id = 'fixture-container'
+    # The innermost element receives the paragraphs
+    start = start[:-1] + f' id="{container_id}">'
+    script = (f"<script>setTimeout(function() {{"
+              f" var c = document.getElementById('{container_id}');"
+              f" {json.dumps(paragraphs)}.forEach(function(t) {{ var p = document.createElement('p');"
+              f" p.textContent = t; c.appendChild(p); }}); }}, {int(js_delay_ms)});</script>")
+    return f'<html><head><title>{html.escape(path)}</title></head><body>{nav}{start}{end}{script}</body></html>'
+
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, keep-alive clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        time.sleep(max(0.0, config['latency'] + random.uniform(-config['jitter'], config['jitter'])))
+        if url.path.startswith('/asset/'):
+            return self._send(b'\xff\xd8' + bytes(config['image_kb'] * 1024), 'image/jpeg')
+        if 'js' in query:
+            js_delay = int(query['js'][0] or config['js_delay_ms'])
+        else:
+            # Pages are consistently static or JS-rendered, like real sites
+            bucket = int(hashlib.sha256(url.path.encode('utf-8')).hexdigest(), 16) % 1000 / 1000
+            js_delay = config['js_delay_ms'] if bucket < config['js_fraction'] else None
+        self._send(render(url.path, js_delay).encode('utf-8'), 'text/html; charset=utf-8')
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port=0):
+    """
+    Serve fixture pages from a background thread.
+
+    Args:
+        port (int): Port to bind on 127.0.0.1; 0 picks a free one.
+
+    Returns:
+        tuple: (server, base URL such as 'http://127.0.0.1:8000/').
+    """
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/'
+
+
+def article_urls(base, n, domains=None):
+    """
+    Fixture article URLs cycling through the domains, e.g. http://127.0.0.1:8000/www.cnn.com/story-3.
+
+    The 'www.' host in the path keeps the scraper's website check and site-selector matching working.
+
+    Args:
+        base (str): Base URL returned by `start`.
+        n (int): Number of URLs.
+        domains (list or None): Domains to cycle through; default every fixture domain.
+
+    Returns:
+        list: Article URLs.
+    """
+    domains = list(domains or SITE_CONTAINERS)
+    return [f'{base}www.{domains[i % len(domains)]}/story-{i}' for i in range(n)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve fixture article pages for benchmarks.')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=config['latency'], help='Seconds added to every response.')
+    parser.add_argument('--js-fraction', type=float, default=config['js_fraction'],
+                        help='Fraction of pages whose text is inserted by JavaScript.')
+    parser.add_argument('--js-delay-ms', type=int, default=config['js_delay_ms'])
+    parser.add_argument('--images', type=int, default=config['images'], help='Images embedded in every page.')
+    args = parser.parse_args()
+    config.update(latency=args.latency, js_fraction=args.js_fraction, js_delay_ms=args.js_delay_ms, images=args.images)
+    server, base = start(args.port)
+    print(f'Serving fixture articles at {base}www.cnn.com/story-1 (Ctrl+C to stop)')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
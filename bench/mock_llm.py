@@ -0,0 +1,144 @@
+import argparse
+import http.server
+import json
+import random
+import re
+import threading
+import time
+
+# Server-wide fault and latency settings; change them between runs, e.g. mock_llm.config['rate_429'] = 0.2
+config = dict(
+    latency=0.3,        # seconds per request
+    per_token=0.0,      # extra seconds per completion token
+    jitter=0.1,         # +/- seconds of uniform noise
+    rate_429=0.0,       # fraction of requests answered 429 Too Many Requests
+    retry_after=1,      # Retry-After seconds sent with 429s (None to omit)
+    rate_5xx=0.0,       # fraction answered 503
+    rate_timeout=0.0,   # fraction that stall for `stall` seconds before answering
+    stall=30.0,
+)
+
+# Counters since start (or the last reset)
+counts = dict(requests=0, ok=0, status_429=0, status_5xx=0, stalled=0)
+_lock = threading.Lock()
+
+
+def reset():
+    """Zero the request counters."""
+    with _lock:
+        for key in counts:
+            counts[key] = 0
+
+
+def _count(key):
+    with _lock:
+        counts[key] += 1
+
+
+def answer(prompt):
+    """
+    Build a fake completion for a prompt, answering batched <article id> prompts with a JSON object.
+
+    Args:
+        prompt (str): The user message.
+
+    Returns:
+        str: Completion text.
+    """
+    articles = re.findall(r'<article id="(\d+)">\n(.*?)\n</article>', prompt, re.S)
+    if articles:
+        return json.dumps({key: 'Summary: ' + ' '.join(text.split()[:25]) for key, text in articles})
+    return 'Summary: ' + ' '.join(prompt.split()[-40:])
+
+
+class MockChatHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, keep-alive clients stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        _count('requests')
+        roll = random.random()
+        if roll < config['rate_429']:
+            _count('status_429')
+            headers = {} if config['retry_after'] is None else {'Retry-After': str(config['retry_after'])}
+            return self._send(429, {'error': {'code': '429', 'message': 'Rate limit exceeded'}}, headers)
+        roll -= config['rate_429']
+        if roll < config['rate_5xx']:
+            _count('status_5xx')
+            return self._send(503, {'error': {'code': '503', 'message': 'Service unavailable'}})
+        roll -= config['rate_5xx']
+        if roll < config['rate_timeout']:
+            _count('stalled')
+            time.sleep(config['stall'])
+
+        messages = body.get('messages', [])
+        prompt = messages[-1]['content'] if messages else ''
+        completions = [answer(prompt) for _ in range(body.get('n', 1))]
+        prompt_tokens = sum(len(m['content']) for m in messages) // 4
+        completion_tokens = sum(len(c) for c in completions) // 4
+        time.sleep(max(0.0, config['latency'] + config['per_token'] * completion_tokens
+                       + random.uniform(-config['jitter'], config['jitter'])))
+        _count('ok')
+        self._send(200, {
+            'choices': [{'index': i, 'message': {'role': 'assistant', 'content': c}} for i, c in enumerate(completions)],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on a stalled request
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port=0):
+    """
+    Serve a mock chat-completions endpoint from a background thread.
+
+    Point the client at it with `respond.BASE_URL = base` (or GPT_RAND_BASE_URL=base);
+    any deployment path is accepted.
+
+    Args:
+        port (int): Port to bind on 127.0.0.1; 0 picks a free one.
+
+    Returns:
+        tuple: (server, base URL such as 'http://127.0.0.1:8001/').
+    """
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), MockChatHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve a mock chat-completions endpoint for benchmarks.')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--latency', type=float, default=config['latency'])
+    parser.add_argument('--rate-429', type=float, default=config['rate_429'])
+    parser.add_argument('--retry-after', type=float, default=config['retry_after'])
+    parser.add_argument('--rate-5xx', type=float, default=config['rate_5xx'])
+    parser.add_argument('--rate-timeout', type=float, default=config['rate_timeout'])
+    parser.add_argument('--stall', type=float, default=config['stall'])
+    args = parser.parse_args()
+    config.update(latency=args.latency, rate_429=args.rate_429, retry_after=args.retry_after, rate_5xx=args.rate_5xx,
+                  rate_timeout=args.rate_timeout, stall=args.stall)
+    server, base = start(args.port)
+    print(f'Mock chat-completions endpoint at {base} (set GPT_RAND_BASE_URL={base}; Ctrl+C to stop)')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
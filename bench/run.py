@@ -0,0 +1,233 @@
+"""
+Offline throughput benchmarks against local stand-ins for news sites and the GPT gateway.
+
+    python -m bench.run                         # every scenario, 200 articles each
+    python -m bench.run -s summarize_batched -s pipeline --articles 500 --json bench.json
+
+Each scenario runs in a fresh process, so its peak RSS is its own. The
+processes it starts (chromedriver and Chrome) are sampled during the run and
+their combined peak RSS is reported separately. Scenarios that need Chrome
+are reported as skipped when no driver can be started.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench import fixture_sites, mock_llm
+
+# Domains served as static HTML, i.e. everything the HTTP fast path can read
+STATIC_DOMAINS = [domain for domain in fixture_sites.SITE_CONTAINERS if domain != 'proquest.com']
+
+# name -> settings; 'sites' and 'llm' override the fixture and mock server configs,
+# 'stage' is the metrics stage whose p50/p95 is reported as per-item latency
+SCENARIOS = {
+    'scrape_http': dict(kind='scrape', workers=8, http_first=True, domains=STATIC_DOMAINS,
+                        sites=dict(latency=0.1), stage='scrape_http'),
+    'scrape_chrome': dict(kind='scrape', workers=4, http_first=False, chrome=True,
+                          sites=dict(latency=0.1, js_fraction=0.3, js_delay_ms=800, images=8), stage='page_load'),
+    'scrape_chrome_full': dict(kind='scrape', workers=4, http_first=False, chrome=True, lean=False,
+                               sites=dict(latency=0.1, js_fraction=0.3, js_delay_ms=800, images=8), stage='page_load'),
+    'summarize_serial': dict(kind='summarize', concurrency=1, articles=40, llm=dict(latency=0.3), stage='summarize'),
+    'summarize_concurrent': dict(kind='summarize', concurrency=8, llm=dict(latency=0.3), stage='gpt_request'),
+    'summarize_batched': dict(kind='summarize', concurrency=8, batch_tokens=6000, llm=dict(latency=0.3, per_token=0.002),
+                              stage='gpt_request'),
+    'summarize_429': dict(kind='summarize', concurrency=8, llm=dict(latency=0.3, rate_429=0.2, retry_after=1),
+                          stage='gpt_request'),
+    'summarize_timeouts': dict(kind='summarize', concurrency=8, timeout=2,
+                               llm=dict(latency=0.3, rate_timeout=0.05, stall=5), stage='gpt_request'),
+    'pipeline': dict(kind='pipeline', workers=8, concurrency=8, domains=STATIC_DOMAINS,
+                     sites=dict(latency=0.1), llm=dict(latency=0.3), stage='summarize'),
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where `resource` is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def _descendants(pid):
+    """Ids of every process below `pid`, read from /proc."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name in parentheses may contain spaces; the parent id follows the state
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        parents.setdefault(ppid, []).append(int(entry))
+    found, todo = [], [pid]
+    while todo:
+        children = parents.get(todo.pop(), [])
+        found.extend(children)
+        todo.extend(children)
+    return found
+
+
+def _rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+class ChildRssSampler:
+    """
+    Samples the combined RSS of this process's descendants (chromedriver and Chrome) in a background thread.
+
+    `peak_mb` is the highest total seen, or None where /proc is unavailable.
+
+    Args:
+        interval (float): Seconds between samples.
+    """
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            self.peak = max(self.peak, sum(_rss_bytes(pid) for pid in _descendants(os.getpid())))
+            if self._stop.wait(self.interval):
+                break
+
+    def __enter__(self):
+        if os.path.isdir('/proc'):
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    @property
+    def peak_mb(self):
+        return self.peak / (1024 * 1024) if os.path.isdir('/proc') else None
+
+
+def _run_scenario(name, spec, sites_base, llm_base, n):
+    """Run one scenario inside a worker process and return its measurements."""
+    import pandas as pd
+
+    import scrape_and_summ as ss
+    import summarization
+    from GPT_RAND import respond
+    from metrics import metrics
+
+    respond.BASE_URL = llm_base
+    summarization.configure(timeout=spec.get('timeout'))
+    ss.configure(lean=spec.get('lean', True))
+    n = spec.get('articles', n)
+
+    if spec.get('chrome'):
+        try:
+            ss.webdriver.Chrome(options=ss.chrome_options()).quit()
+        except Exception as e:
+            return dict(scenario=name, skipped=f"Chrome unavailable: {str(e).splitlines()[0]}")
+
+    metrics.clear()
+    urls = fixture_sites.article_urls(sites_base, n, spec.get('domains'))
+    started = time.perf_counter()
+    with ChildRssSampler() as drivers:
+        if spec['kind'] == 'scrape':
+            results = ss.scrape_articles_from_list(urls, workers=spec['workers'], http_first=spec['http_first'])
+        elif spec['kind'] == 'summarize':
+            articles = ['\n\n'.join(fixture_sites.article_paragraphs(url)) for url in urls]
+            started = time.perf_counter()
+            results = summarization.articles_summarization(articles, concurrency=spec['concurrency'],
+                                                           batch_tokens=spec.get('batch_tokens'))
+        else:
+            df = pd.DataFrame({'Source_coding_info': urls, 'Case_summary': [None] * n})
+            df = ss.scrape_n_summ(df, workers=spec['workers'], concurrency=spec['concurrency'], pipeline=True)
+            results = list(df['Case_summary'])
+        seconds = time.perf_counter() - started
+
+    summary = metrics.summary()
+    stage = summary['stages'].get(spec['stage'], {})
+    counters = summary['counters']
+    return dict(
+        scenario=name, items=n, ok=sum(1 for r in results if r), seconds=seconds, items_per_sec=n / seconds,
+        stage=spec['stage'], p50=stage.get('p50'), p95=stage.get('p95'), peak_rss_mb=peak_rss_mb(),
+        driver_rss_mb=drivers.peak_mb,
+        gpt_requests=counters.get('gpt_requests', 0), retries=counters.get('respond_retries', 0),
+    )
+
+
+def run(names, n=200):
+    """
+    Run scenarios against freshly started fixture and mock servers.
+
+    Args:
+        names (list): Scenario names from SCENARIOS.
+        n (int): Articles per scenario (some scenarios use fewer).
+
+    Returns:
+        list: One result dict per scenario.
+    """
+    _, sites_base = fixture_sites.start()
+    _, llm_base = mock_llm.start()
+    site_defaults, llm_defaults = dict(fixture_sites.config), dict(mock_llm.config)
+    results = []
+    for name in names:
+        spec = SCENARIOS[name]
+        fixture_sites.config.update(site_defaults, **spec.get('sites', {}))
+        mock_llm.config.update(llm_defaults, **spec.get('llm', {}))
+        mock_llm.reset()
+        print(f"--- {name}")
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            result = executor.submit(_run_scenario, name, spec, sites_base, llm_base, n).result()
+        result['llm'] = dict(mock_llm.counts)
+        results.append(result)
+    return results
+
+
+def _ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def print_table(results):
+    header = f"{'scenario':<22}{'items':>6}{'ok':>6}{'sec':>8}{'items/s':>9}{'stage':>13}{'p50 ms':>8}{'p95 ms':>8}" \
+             f"{'RSS MB':>8}{'drv MB':>8}{'GPT':>6}{'retry':>6}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        if 'skipped' in r:
+            print(f"{r['scenario']:<22}skipped: {r['skipped']}")
+            continue
+        rss = '-' if r['peak_rss_mb'] is None else f"{r['peak_rss_mb']:.0f}"
+        drv = '-' if r['driver_rss_mb'] is None else f"{r['driver_rss_mb']:.0f}"
+        print(f"{r['scenario']:<22}{r['items']:>6}{r['ok']:>6}{r['seconds']:>8.1f}{r['items_per_sec']:>9.1f}"
+              f"{r['stage']:>13}{_ms(r['p50']):>8}{_ms(r['p95']):>8}{rss:>8}{drv:>8}{r['gpt_requests']:>6}"
+              f"{r['retries']:>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run offline scraping and summarization benchmarks.')
+    parser.add_argument('-s', '--scenario', action='append', choices=list(SCENARIOS),
+                        help='Scenario to run; repeat for several (default: all).')
+    parser.add_argument('--articles', type=int, default=200, help='Articles per scenario.')
+    parser.add_argument('--json', help='Also write the results to this JSON file.')
+    args = parser.parse_args()
+    results = run(args.scenario or list(SCENARIOS), args.articles)
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
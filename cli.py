@@ -0,0 +1,386 @@
+"""
+Command-line entry point for scraping and summarizing article workbooks.
+
+    python cli.py run [options]         scrape and summarize (the default command)
+    python cli.py scrape [options]      scrape article text into a column
+    python cli.py summarize [options]   summarize an existing article text column
+
+pandas, selenium and the GPT client are imported by the commands that need
+them, so `--help` and `summarize` start quickly, and importing this module has
+no side effects. From Python, `main(['summarize', 'file.xlsx', '--model', '4o'])`
+runs a command like the shell would.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+COMMANDS = ('run', 'scrape', 'summarize')
+INPUT_PATTERNS = ('*.xlsx', '*.csv', '*.parquet')
+
+
+def parse_rows(text):
+    """Parse a 'START:STOP' row range; either bound may be left empty."""
+    start, sep, stop = text.partition(':')
+    try:
+        if not sep:
+            raise ValueError
+        return int(start or 0), int(stop) if stop else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:STOP, got {text!r}")
+
+
+def build_parser():
+    """
+    Build the argument parser with the run, scrape and summarize subcommands.
+
+    Returns:
+        argparse.ArgumentParser: The parser; each subcommand sets `func`.
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='*',
+                        help='Input workbooks (.xlsx, .csv or .parquet); default: every one in --input-dir.')
+    common.add_argument('--input-dir', default='Data/', help='Directory searched when no files are given.')
+    common.add_argument('--output-dir', default='Data/Processed/', help='Directory for output workbooks.')
+    common.add_argument('--rows', type=parse_rows, default=(0, None), metavar='START:STOP',
+                        help='Row range of each workbook to process, e.g. 100:115 (default: all rows).')
+    common.add_argument('--chunk-rows', type=int, default=5000,
+                        help='Rows read, processed and written at a time, keeping memory flat on large inputs.')
+    common.add_argument('--output-format', choices=['xlsx', 'csv', 'parquet'],
+                        help='Output format (default: same as the input file).')
+    common.add_argument('--overwrite', action='store_true', help='Redo rows whose output column is already filled.')
+    common.add_argument('--cache', default='Data/.cache/scrape_summ.sqlite',
+                        help='Article and summary cache file.')
+    common.add_argument('--no-cache', action='store_true', help='Neither read nor write the cache.')
+    common.add_argument('--report',
+                        help='Path of the JSON run metrics report (default: run_report.json in --output-dir); '
+                             'per-event timings go to the matching .csv.')
+    common.add_argument('--debug', action='store_true', help='Print debug information.')
+
+    scraping = argparse.ArgumentParser(add_help=False)
+    scraping.add_argument('--url-col', default='Source_coding_info', help='Column containing the article URLs.')
+    scraping.add_argument('--workers', type=int, default=4, help='Pooled Chrome drivers scraping at once.')
+    scraping.add_argument('--page-timeout', type=float, default=15, help='Seconds Chrome may spend loading a page.')
+    scraping.add_argument('--full-browser', action='store_true',
+                          help='Load every page resource (images, fonts, media, ad and analytics scripts) '
+                               'instead of the lean Chrome profile.')
+    scraping.add_argument('--selector-stats', default='Data/.cache/selector_stats.sqlite',
+                          help='Learned per-domain selector statistics file.')
+
+    summarizing = argparse.ArgumentParser(add_help=False)
+    summarizing.add_argument('--sum-col', default='Case_summary', help='Column the summaries are written to.')
+    summarizing.add_argument('--concurrency', type=int, default=8, help='Summarization requests in flight.')
+    summarizing.add_argument('--model', default='4om', choices=['3', '4', '4o', '4om'], help='GPT deployment key.')
+    summarizing.add_argument('--timeout', type=float, default=60, help='Seconds to wait for one GPT response.')
+    summarizing.add_argument('--rpm', type=int,
+                             help='Requests-per-minute limit across every GPT request of the run '
+                                  '(split evenly between --processes).')
+    summarizing.add_argument('--tpm', type=int,
+                             help='Tokens-per-minute limit across every GPT request of the run '
+                                  '(split evenly between --processes).')
+    summarizing.add_argument('--dedupe-threshold', type=float, default=0.8,
+                             help='Articles at least this similar (estimated word-shingle Jaccard) share one summary; '
+                                  '0 disables deduplication.')
+
+    parser = argparse.ArgumentParser(prog='cli.py', description='Scrape and summarize the articles listed in workbooks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', parents=[common, scraping, summarizing],
+                              help='Scrape and summarize every pending row.')
+    run.add_argument('--processes', type=int, default=1,
+                     help='Worker processes sharing one work queue across all workbooks (each runs its own Chrome).')
+    run.add_argument('--resume', action='store_true',
+                     help="Skip rows already summarized according to each workbook's job journal.")
+    run.add_argument('--incremental', action='store_true',
+                     help='Redo only rows whose URL, article text or prompt changed since the last run (per-row '
+                          'manifest in --output-dir/.manifest) and update just those cells of the existing output.')
+    run.add_argument('--flush-every', type=int, default=50,
+                     help='Finished rows before the first interim write of the output workbook; each later write waits '
+                          'until that count has doubled.')
+    run.set_defaults(func=run_command)
+
+    scrape = commands.add_parser('scrape', parents=[common, scraping], help='Scrape article text only.')
+    scrape.add_argument('--text-col', default='Article_text', help='Column the article text is written to.')
+    scrape.set_defaults(func=scrape_command)
+
+    summarize = commands.add_parser('summarize', parents=[common, summarizing],
+                                    help='Summarize an existing article text column (no Chrome).')
+    summarize.add_argument('--text-col', default='Article_text', help='Column containing the article text.')
+    summarize.add_argument('--batch-tokens', type=int,
+                           help='Pack short articles into shared requests of up to this many estimated tokens.')
+    summarize.set_defaults(func=summarize_command)
+    return parser
+
+
+def input_files(args):
+    """The files named on the command line, or every supported workbook in --input-dir."""
+    if args.files:
+        return list(args.files)
+    return sorted(path for pattern in INPUT_PATTERNS for path in glob.glob(os.path.join(args.input_dir, pattern)))
+
+
+def output_path(args, file_path, suffix):
+    """Output path for an input workbook: <output-dir>/<name><suffix><ext>."""
+    name, ext = os.path.splitext(os.path.basename(file_path))
+    if args.output_format:
+        ext = '.' + args.output_format
+    return os.path.join(args.output_dir, f"{name}{suffix}{ext}")
+
+
+def _write_report(args, cache=None):
+    from metrics import metrics
+
+    path = args.report or os.path.join(args.output_dir, 'run_report.json')
+    metrics.write_report(path, os.path.splitext(path)[0] + '.csv', **({'cache': cache.stats} if cache else {}))
+    print(f"Run report saved: {path}")
+
+
+def _interim_writer(args, file_path, path, journal):
+    """
+    Build the `flush` callback that writes interim output during a single-process run.
+
+    The output is rebuilt from the input with the journal's finished summaries,
+    once --flush-every rows have finished and then each time that count has
+    doubled, so partial results are on disk if the run is killed.
+    """
+    import table_io
+    from metrics import metrics
+
+    start, stop = args.rows
+    schedule = {'next': args.flush_every}
+
+    def flush(df_):
+        done = len(journal.rows)
+        if done < schedule['next']:
+            return
+        schedule['next'] = max(2 * done, done + args.flush_every)
+        with metrics.timer('write_interim', url=file_path, rows=done):
+            table_io.copy_with_column(file_path, path, args.sum_col, journal.completed(), start=start, stop=stop,
+                                      chunk_rows=args.chunk_rows)
+
+    return flush
+
+
+def _per_process(limit, processes):
+    """Share of a per-minute limit for each of `processes` worker processes, each with its own limiter."""
+    return None if limit is None else max(1, limit // processes)
+
+
+def run_command(args):
+    """Scrape and summarize every pending row of every input workbook."""
+    import scrape_and_summ as ss
+    import table_io
+    from article_cache import ArticleCache
+    from job_journal import JobJournal
+    from metrics import metrics
+    from selector_stats import SelectorStats
+
+    ss.configure(args.model, args.timeout, args.page_timeout, args.dedupe_threshold, not args.full_browser,
+                 args.rpm, args.tpm)
+    files = input_files(args)
+    print(f"{len(files)} input files")
+    os.makedirs(args.output_dir, exist_ok=True)
+    cache_path = None if args.no_cache else args.cache
+    journal_dir = os.path.join(args.output_dir, '.journal')
+    start, stop = args.rows
+
+    if args.incremental:
+        if args.processes > 1:
+            raise SystemExit("--incremental runs in a single process; drop --processes.")
+        _run_incremental(args, files)
+        return
+
+    if args.processes > 1:
+        from workbook_scheduler import run_workbooks
+        run_workbooks(files, args.output_dir, processes=args.processes, url_col=args.url_col, sum_col=args.sum_col,
+                      overwrite=args.overwrite, cache_path=cache_path, stats_path=args.selector_stats,
+                      journal_dir=journal_dir, resume=args.resume, flush_every=args.flush_every,
+                      concurrency=args.concurrency, start=start, stop=stop, output_format=args.output_format,
+                      chunk_rows=args.chunk_rows, settings=dict(model=args.model, timeout=args.timeout, page_timeout=args.page_timeout,
+                                    dedupe=args.dedupe_threshold, lean=not args.full_browser,
+                                    rpm=_per_process(args.rpm, args.processes),
+                                    tpm=_per_process(args.tpm, args.processes)),
+                      debug=args.debug)
+        _write_report(args)
+        return
+
+    # Scraped articles and summaries are reused across files and reruns
+    cache = ArticleCache(cache_path) if cache_path else None
+    # Learned per-domain selector order, shared across runs
+    stats = SelectorStats(args.selector_stats)
+    for file_path in files:
+        path = output_path(args, file_path, '_summary_appended')
+        # Per-workbook journal of finished rows, used by --resume
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        journal = JobJournal(os.path.join(journal_dir, f"{name}.jsonl"), resume=args.resume)
+        flush = _interim_writer(args, file_path, path, journal)
+        # Read, process and append the output one chunk of rows at a time. The output only
+        # becomes complete when the writer closes, so it is built beside the interim copies.
+        partial = table_io.temp_path(path, 'partial')
+        with table_io.TableWriter(partial) as writer:
+            for df in table_io.read_chunks(file_path, args.chunk_rows, start=start, stop=stop):
+                started = time.perf_counter()
+                df_ = ss.scrape_n_summ(df, url_col=args.url_col, sum_col=args.sum_col, mask=ss.search_mask(df),
+                                       overwrite=args.overwrite, debug=args.debug, workers=args.workers,
+                                       concurrency=args.concurrency, pipeline=True, cache=cache, stats=stats,
+                                       journal=journal, flush=flush, flush_every=args.flush_every)
+                metrics.observe('process_chunk', time.perf_counter() - started, url=file_path, rows=len(df_))
+                with metrics.timer('write_chunk', url=file_path, rows=len(df_)):
+                    writer.write(df_)
+        os.replace(partial, path)
+        journal.close()
+        print(f"Processed and saved: {path}")
+
+    if cache is not None:
+        print(cache.report())
+    _write_report(args, cache)
+    if cache is not None:
+        cache.close()
+    stats.close()
+
+
+def _run_incremental(args, files):
+    """Refresh each output workbook from its manifest, writing only the rows that changed."""
+    import pandas as pd
+
+    import scrape_and_summ as ss
+    import table_io
+    from article_cache import ArticleCache
+    from manifest import RunManifest
+    from metrics import metrics
+    from selector_stats import SelectorStats
+
+    cache = None if args.no_cache else ArticleCache(args.cache)
+    stats = SelectorStats(args.selector_stats)
+    start, stop = args.rows
+    for file_path in files:
+        path = output_path(args, file_path, '_summary_appended')
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        manifest = RunManifest(os.path.join(args.output_dir, '.manifest', f"{name}.sqlite"))
+        if os.path.exists(path):
+            existing, writer = table_io.count_rows(path), None
+        else:
+            # Without an output to patch, every row is written and the manifest starts over
+            manifest.clear()
+            existing, writer = 0, table_io.TableWriter(path)
+        patches = []
+        for df in table_io.read_chunks(file_path, args.chunk_rows, start=start, stop=stop):
+            started = time.perf_counter()
+            df_, changed = ss.refresh_rows(df, manifest, url_col=args.url_col, sum_col=args.sum_col,
+                                           mask=ss.search_mask(df), overwrite=args.overwrite, debug=args.debug,
+                                           workers=args.workers, concurrency=args.concurrency, cache=cache,
+                                           stats=stats, max_age=cache.ttl if cache else None)
+            metrics.observe('process_chunk', time.perf_counter() - started, url=file_path, rows=len(df_))
+            if writer is not None:
+                writer.write(df_)
+            else:
+                # Row labels count input rows; the output holds rows START onwards, so row
+                # `label` sits at position `label - start` there
+                position = df_.index - start
+                # Changed rows, plus rows added to the input since the output was written
+                rows = df_.loc[df_.index.isin(changed) | (position >= existing)]
+                patches.append(rows.set_axis(rows.index - start))
+        if writer is not None:
+            writer.close()
+            print(f"Processed and saved: {path}")
+        else:
+            rows = pd.concat(patches) if patches else None
+            if rows is not None and len(rows):
+                with metrics.timer('write_chunk', url=file_path, rows=len(rows)):
+                    table_io.patch_table(path, rows, [args.url_col, args.sum_col])
+            print(f"Updated {0 if rows is None else len(rows)} rows: {path}")
+        manifest.close()
+
+    if cache is not None:
+        print(cache.report())
+    _write_report(args, cache)
+    if cache is not None:
+        cache.close()
+    stats.close()
+
+
+def scrape_command(args):
+    """Scrape article text for every pending row into --text-col, without summarizing."""
+    import scrape_and_summ as ss
+    import table_io
+    from article_cache import ArticleCache
+    from selector_stats import SelectorStats
+
+    ss.configure(page_timeout=args.page_timeout, lean=not args.full_browser)
+    files = input_files(args)
+    print(f"{len(files)} input files")
+    cache = None if args.no_cache else ArticleCache(args.cache)
+    stats = SelectorStats(args.selector_stats)
+    start, stop = args.rows
+    for file_path in files:
+        path = output_path(args, file_path, '_articles')
+        with table_io.TableWriter(path) as writer:
+            for df in table_io.read_chunks(file_path, args.chunk_rows, start=start, stop=stop):
+                writer.write(ss.scrape_rows(df, url_col=args.url_col, text_col=args.text_col, mask=ss.search_mask(df),
+                                            overwrite=args.overwrite, debug=args.debug, workers=args.workers,
+                                            cache=cache, stats=stats))
+        print(f"Scraped and saved: {path}")
+
+    _write_report(args, cache)
+    if cache is not None:
+        cache.close()
+    stats.close()
+
+
+def summarize_command(args):
+    """Summarize --text-col into --sum-col for every row that has text, e.g. the output of `scrape`."""
+    import summarization
+    import table_io
+    from article_cache import ArticleCache
+
+    summarization.configure(args.model, args.timeout, args.dedupe_threshold, args.rpm, args.tpm)
+    files = input_files(args)
+    print(f"{len(files)} input files")
+    cache = None if args.no_cache else ArticleCache(args.cache)
+    start, stop = args.rows
+    for file_path in files:
+        path = output_path(args, file_path, '_summary_appended')
+        with table_io.TableWriter(path) as writer:
+            for df in table_io.read_chunks(file_path, args.chunk_rows, start=start, stop=stop):
+                if args.sum_col not in df:
+                    df[args.sum_col] = None
+                if df[args.sum_col].dtype != object:
+                    df[args.sum_col] = df[args.sum_col].astype(object)
+                texts = df[args.text_col].astype('string').str.strip()
+                todo = (texts.notna() & (texts != '')).fillna(False).astype(bool)
+                if not args.overwrite:
+                    todo &= df[args.sum_col].isna()
+                texts = df.loc[todo, args.text_col]
+                # Identical texts are summarized once
+                unique = list(texts.drop_duplicates())
+                summaries = summarization.articles_summarization(
+                    unique, debug=args.debug, concurrency=args.concurrency, cache=cache, batch_tokens=args.batch_tokens)
+                df.loc[todo, args.sum_col] = texts.map(dict(zip(unique, summaries)))
+                writer.write(df)
+        print(f"Summarized and saved: {path}")
+
+    if cache is not None:
+        print(cache.report())
+    _write_report(args, cache)
+    if cache is not None:
+        cache.close()
+
+
+def main(argv=None):
+    """
+    Run a command-line command.
+
+    Args:
+        argv (list or None): Arguments without the program name; defaults to sys.argv[1:].
+            Without a command, 'run' is assumed.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv = ['run'] + argv
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import hashlib
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Mersenne prime 2**61 - 1 keeps (a * x + b) mod p exact in uint64 for 32-bit x and a, b < 2**29
+_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r'\w+')
+
+
+def normalize(text):
+    """Lower-case words only, so whitespace, punctuation and case do not affect matching."""
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def shingle_hashes(words, k=5):
+    """
+    Hash the overlapping k-word shingles of a text.
+
+    Args:
+        words (list): Normalized words.
+        k (int): Words per shingle.
+
+    Returns:
+        np.ndarray: Distinct 32-bit shingle hashes as uint64.
+    """
+    if len(words) <= k:
+        shingles = [' '.join(words)]
+    else:
+        shingles = [' '.join(words[i:i + k]) for i in range(len(words) - k + 1)]
+    return np.unique(np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64,
+                                 count=len(shingles)))
+
+
+class DedupeIndex:
+    """
+    Incremental exact and near-duplicate detector for article text.
+
+    Every text is first matched on a hash of its normalized words. Texts of at
+    least `min_words` words are then compared through MinHash signatures of their
+    word shingles, bucketed with LSH banding; a candidate counts as a near
+    duplicate when its estimated Jaccard similarity reaches `threshold`. The
+    first text seen in a cluster is its representative. Thread-safe.
+
+    Args:
+        threshold (float): Estimated Jaccard similarity needed for a near duplicate.
+        num_perm (int): MinHash permutations; must be divisible by `bands`.
+        bands (int): LSH bands; more bands find candidates at lower similarity.
+        shingle (int): Words per shingle.
+        min_words (int): Shorter texts are only matched exactly.
+        seed (int): Seed for the MinHash permutations.
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=32, shingle=5, min_words=50, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 29, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 29, size=num_perm, dtype=np.uint64)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle = shingle
+        self.min_words = min_words
+        self.stats = dict(exact=0, near=0, unique=0)
+        self._exact = {}
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def signature(self, words):
+        """MinHash signature of a word list."""
+        hashes = shingle_hashes(words, self.shingle)
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def add(self, key, text):
+        """
+        Register a text and report what it duplicates.
+
+        Args:
+            key: Caller's identifier for the text (e.g. its position).
+            text (str): Article text.
+
+        Returns:
+            tuple: (key of the representative it duplicates, or None if it is new,
+            'exact', 'near' or None).
+        """
+        words = normalize(text).split()
+        digest = hashlib.sha1(' '.join(words).encode('utf-8')).digest()
+        # The signature is computed outside the lock; it is the expensive part.
+        signature = self.signature(words) if len(words) >= self.min_words else None
+        with self._lock:
+            if digest in self._exact:
+                self.stats['exact'] += 1
+                return self._exact[digest], 'exact'
+            self._exact[digest] = key
+            if signature is None:
+                self.stats['unique'] += 1
+                return None, None
+            bands = [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+            seen = set()
+            for band, bucket in zip(bands, self._buckets):
+                for other in bucket.get(band, ()):
+                    if other in seen:
+                        continue
+                    seen.add(other)
+                    if np.mean(self._signatures[other] == signature) >= self.threshold:
+                        # Later exact copies of this text map to the same representative
+                        self._exact[digest] = other
+                        self.stats['near'] += 1
+                        return other, 'near'
+            for band, bucket in zip(bands, self._buckets):
+                bucket.setdefault(band, []).append(key)
+            self._signatures[key] = signature
+            self.stats['unique'] += 1
+            return None, None
+
+
+def find_duplicates(texts, **options):
+    """
+    Map every text to the representative of its duplicate cluster.
+
+    Args:
+        texts (list): Article texts; empty entries are skipped.
+        **options: Passed to `DedupeIndex`.
+
+    Returns:
+        tuple: (list with, for each text, the index of its representative (itself
+        if unique) or None for empty entries, stats dict with exact/near/unique counts).
+    """
+    index = DedupeIndex(**options)
+    representatives = []
+    for i, text in enumerate(texts):
+        if not text:
+            representatives.append(None)
+            continue
+        rep, _ = index.add(i, text)
+        representatives.append(i if rep is None else rep)
+    return representatives, index.stats
@@ -0,0 +1,160 @@
+import collections
+import contextlib
+import threading
+import time
+
+from metrics import metrics
+from selector_stats import domain_of
+
+
+class _Domain:
+    """Queue and politeness state of one domain."""
+
+    def __init__(self, concurrency, delay):
+        self.queue = collections.deque()
+        self.concurrency = max(1, int(concurrency))
+        self.base_delay = delay
+        self.delay = delay
+        self.active = 0
+        self.next_start = 0.0
+
+    def ready_at(self, now):
+        """Earliest time a new fetch may start, or None while the domain is at its concurrency limit."""
+        if self.active >= self.concurrency:
+            return None
+        return max(now, self.next_start)
+
+
+class DomainScheduler:
+    """
+    Per-domain work queues with politeness limits, shared by concurrent scrapers.
+
+    Work items are queued per domain. `take` hands out the next item from a
+    domain that may be fetched right now, rotating through the domains so a
+    large batch from one site does not keep the others waiting. `slot` wraps
+    the actual fetch: it waits until the domain has a free slot and its delay
+    since the last fetch start has passed, and records the outcome. A failed
+    fetch (timeout, load failure) multiplies the domain's delay by `backoff`,
+    up to `max_delay`; each success shrinks it back towards the configured
+    delay. A page that loads without article text is a success here. Thread-safe.
+
+    Args:
+        key (callable): Maps a URL to the domain whose limits apply.
+        concurrency (int): Fetches in flight per domain.
+        delay (float): Minimum seconds between fetch starts on one domain.
+        limits (dict or None): Per-domain overrides of `concurrency` and `delay`,
+            e.g. {'proquest.com': dict(concurrency=1, delay=3.0)}.
+        max_delay (float): Upper bound of the adaptive delay.
+        backoff (float): Factor the delay grows by after a failure and shrinks by after a success.
+    """
+
+    def __init__(self, key=domain_of, concurrency=2, delay=0.5, limits=None, max_delay=60.0, backoff=2.0):
+        self.key = key
+        self.concurrency = concurrency
+        self.delay = delay
+        self.limits = dict(limits or {})
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self._domains = {}
+        # Domains with queued items, in rotation order
+        self._rotation = collections.deque()
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    def _domain(self, key):
+        domain = self._domains.get(key)
+        if domain is None:
+            limits = self.limits.get(key, {})
+            domain = self._domains[key] = _Domain(limits.get('concurrency', self.concurrency),
+                                                  limits.get('delay', self.delay))
+        return domain
+
+    def put(self, item, url):
+        """
+        Queue a work item under the domain of its URL.
+
+        Args:
+            item: Anything the caller needs back from `take`, e.g. (index, url).
+            url (str): URL that decides the item's domain.
+        """
+        key = self.key(url)
+        with self._cond:
+            domain = self._domain(key)
+            if not domain.queue:
+                self._rotation.append(key)
+            domain.queue.append(item)
+            self._pending += 1
+            self._cond.notify()
+
+    def take(self):
+        """
+        Remove the next item, preferring domains that can be fetched right now.
+
+        If every queued domain is busy or cooling down, the item from the domain
+        that frees up first is returned; `slot` then does the waiting.
+
+        Returns:
+            The next queued item, or None when nothing is left.
+        """
+        with self._cond:
+            if not self._pending:
+                return None
+            now = time.monotonic()
+            best, best_at = 0, None
+            for position, key in enumerate(self._rotation):
+                ready_at = self._domains[key].ready_at(now)
+                if ready_at is not None and (best_at is None or ready_at < best_at):
+                    best, best_at = position, ready_at
+                    if ready_at <= now:
+                        break
+            self._rotation.rotate(-best)
+            key = self._rotation.popleft()
+            domain = self._domains[key]
+            item = domain.queue.popleft()
+            # The domain goes to the back of the rotation so the others get their turn
+            if domain.queue:
+                self._rotation.append(key)
+            self._pending -= 1
+            return item
+
+    @contextlib.contextmanager
+    def slot(self, url):
+        """
+        Hold one of the domain's fetch slots for the duration of a fetch.
+
+        Blocks until the domain is below its concurrency limit and its delay has
+        passed. Set `outcome['ok'] = False` on the yielded dict to report a failed
+        fetch; an exception raised inside the block counts as one too.
+
+        Args:
+            url (str): URL being fetched.
+
+        Yields:
+            dict: Outcome of the fetch, filled in by the caller.
+        """
+        key = self.key(url)
+        with metrics.timer('domain_wait', url=url, domain=key), self._cond:
+            domain = self._domain(key)
+            while True:
+                now = time.monotonic()
+                ready_at = domain.ready_at(now)
+                if ready_at is not None and ready_at <= now:
+                    break
+                self._cond.wait(None if ready_at is None else ready_at - now)
+            domain.active += 1
+            domain.next_start = now + domain.delay
+        outcome = {}
+        failed = True
+        try:
+            yield outcome
+            failed = outcome.get('ok') is False
+        finally:
+            with self._cond:
+                domain.active -= 1
+                if failed:
+                    domain.delay = min(self.max_delay, max(domain.delay, 1.0) * self.backoff)
+                    domain.next_start = max(domain.next_start, time.monotonic() + domain.delay)
+                    metrics.incr('domain_backoffs')
+                else:
+                    domain.delay = max(domain.base_delay, domain.delay / self.backoff)
+                self._cond.notify_all()
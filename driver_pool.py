@@ -0,0 +1,109 @@
+import threading
+
+from selenium import webdriver
+
+
+class DriverPool:
+    """
+    Bounded pool of long-lived headless Chrome drivers.
+
+    Drivers are started lazily, up to `size`, and handed out to whichever
+    worker asks next. A driver is recycled (quit, then replaced on the next
+    `acquire`) after `max_pages` pages or when the caller reports a crash.
+
+    Args:
+        size (int): Maximum number of live drivers.
+        options: Selenium ChromeOptions used to start each driver.
+        max_pages (int): Pages a driver may serve before it is recycled.
+        debug (bool): If True, print debug information.
+    """
+
+    def __init__(self, size, options, max_pages=50, debug=False):
+        self.size = max(1, int(size))
+        self.options = options
+        self.max_pages = max_pages
+        self.debug = debug
+        self._idle = []
+        self._pages = {}
+        self._live = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """
+        Reserve an idle driver, starting a new one if the pool is not full.
+
+        Returns:
+            webdriver.Chrome: A driver reserved for the caller.
+
+        Raises:
+            RuntimeError: If the pool is closed, before or while waiting.
+        """
+        with self._cond:
+            while not self._closed and not self._idle and self._live >= self.size:
+                self._cond.wait()
+            if self._closed:
+                raise RuntimeError("DriverPool is closed")
+            if self._idle:
+                return self._idle.pop()
+            self._live += 1
+        try:
+            if self.debug: print("[DEBUG] Starting new Chrome driver for pool.")
+            driver = webdriver.Chrome(options=self.options)
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._pages[id(driver)] = 0
+            closed = self._closed
+        if closed:
+            # Closed while this driver was starting; nothing would ever quit it
+            self._quit(driver)
+            raise RuntimeError("DriverPool is closed")
+        return driver
+
+    def release(self, driver, crashed=False):
+        """
+        Return a driver to the pool, recycling it if it crashed or is worn out.
+
+        Args:
+            driver: Driver previously obtained from `acquire`.
+            crashed (bool): If True, the driver is quit instead of reused.
+        """
+        with self._cond:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+            retire = crashed or self._closed or pages >= self.max_pages
+            if not retire:
+                self._idle.append(driver)
+                self._cond.notify()
+                return
+        if self.debug: print(f"[DEBUG] Recycling driver after {pages} pages ({'crashed' if crashed else 'limit reached'}).")
+        self._quit(driver)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            if self.debug: print(f"[ERROR] Failed to quit driver: {e}")
+        with self._cond:
+            self._pages.pop(id(driver), None)
+            self._live -= 1
+            self._cond.notify()
+
+    def close(self):
+        """Quit every idle driver; drivers still in use are quit on release, and later `acquire` calls fail."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._quit(driver)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,114 @@
+import threading
+
+import httpx
+from bs4 import BeautifulSoup
+
+# Browser-like headers; several news sites refuse the default httpx user agent.
+HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                   '(KHTML, like Gecko) Chrome/126.0 Safari/537.36'),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(pool_size=20, timeout=10):
+    """
+    Return the shared keep-alive HTTP client, creating it on first use.
+
+    Args:
+        pool_size (int): Maximum number of pooled connections.
+        timeout (float): Connect/read timeout in seconds.
+
+    Returns:
+        httpx.Client: Thread-safe pooled client.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = httpx.Client(
+                headers=HEADERS,
+                follow_redirects=True,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        return _client
+
+
+def selector_css(selector):
+    """
+    Convert a Selenium (By, value) locator into a CSS selector string.
+
+    Args:
+        selector (tuple): Locator such as (By.CSS_SELECTOR, "div.article-body").
+
+    Returns:
+        str or None: Equivalent CSS selector, or None if it cannot be expressed in CSS.
+    """
+    by, value = selector
+    # By.CSS_SELECTOR and By.TAG_NAME; compared by value so selenium need not be imported.
+    if by in ('css selector', 'tag name'):
+        return value
+    return None
+
+
+def extract_paragraphs(html, selectors, debug=False):
+    """
+    Apply selectors in order to an HTML document and return the first non-empty paragraph set.
+
+    Mirrors `scrape_article`: the first element matching a selector is the
+    container, and its non-blank <p> descendants are the article text.
+
+    Args:
+        html (str or bytes): Page source.
+        selectors (list): Selenium (By, value) locators to try in order.
+        debug (bool): If True, print debug information.
+
+    Returns:
+        tuple: (matched CSS selector or None, list of paragraph strings).
+    """
+    soup = BeautifulSoup(html, 'lxml')
+    for selector in selectors:
+        css = selector_css(selector)
+        if css is None:
+            continue
+        container = soup.select_one(css)
+        if container is None:
+            continue
+        paragraphs = [' '.join(p.get_text().split()) for p in container.find_all('p')]
+        paragraphs = [p for p in paragraphs if p]
+        if debug: print(f"[DEBUG] HTTP selector {css!r} matched with {len(paragraphs)} paragraphs.")
+        if paragraphs:
+            return css, paragraphs
+    return None, []
+
+
+def fetch_article_http(url, selectors, client=None, debug=False):
+    """
+    Fetch a page with a plain HTTP GET and extract its article text.
+
+    Args:
+        url (str): The URL of the article.
+        selectors (list): Selenium (By, value) locators to try in order.
+        client (httpx.Client or None): Client to use; defaults to the shared pool.
+        debug (bool): If True, print debug information.
+
+    Returns:
+        str or None: The extracted article text, or None if the page needs a browser.
+    """
+    client = client or get_client()
+    try:
+        response = client.get(url)
+        response.raise_for_status()
+    except Exception as e:
+        if debug: print(f"[DEBUG] HTTP fetch failed for {url}: {e}")
+        return None
+    if 'html' not in response.headers.get('content-type', 'text/html'):
+        if debug: print(f"[DEBUG] HTTP fetch returned non-HTML content for {url}")
+        return None
+    css, paragraphs = extract_paragraphs(response.content, selectors, debug)
+    if debug: print(f"[DEBUG] HTTP fetch {'succeeded' if paragraphs else 'found no paragraphs'} for {url}")
+    return "\n\n".join(paragraphs) if paragraphs else None
@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+import time
+
+
+class JobJournal:
+    """
+    Append-only JSONL log of per-row progress for one input workbook.
+
+    Each line records one stage ('scrape' or 'summary') finishing for one row,
+    so a crashed run can be resumed without redoing completed rows.
+
+    Args:
+        path (str): Journal file, typically one per input workbook.
+        resume (bool): If True, keep and load an existing journal; otherwise start a new one.
+    """
+
+    def __init__(self, path, resume=False):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.rows = {}
+        if resume and os.path.exists(path):
+            self._load()
+        self._lock = threading.Lock()
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated last line.
+                    continue
+                self.rows.setdefault(entry['row'], {})[entry['stage']] = entry
+
+    def record(self, row, stage, status, **fields):
+        """
+        Append the outcome of one stage for one row and flush it to disk.
+
+        Args:
+            row: DataFrame index label of the row.
+            stage (str): 'scrape' or 'summary'.
+            status (str): 'ok' or 'failed'.
+            **fields: Extra JSON-serializable values to store (e.g. summary=...).
+        """
+        row = row.item() if hasattr(row, 'item') else row
+        entry = dict(row=row, stage=stage, status=status, ts=time.time(), **fields)
+        with self._lock:
+            self.rows.setdefault(row, {})[stage] = entry
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def completed(self):
+        """
+        Rows whose summary has already been produced.
+
+        Returns:
+            dict: Row label -> summary text.
+        """
+        return {row: stages['summary'].get('summary')
+                for row, stages in self.rows.items()
+                if stages.get('summary', {}).get('status') == 'ok'}
+
+    def close(self):
+        with self._lock:
+            self._file.close()
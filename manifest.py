@@ -0,0 +1,107 @@
+import collections
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# What produced a row's summary: hashes of the cleaned URL, the article text and the prompt/model settings
+ManifestEntry = collections.namedtuple('ManifestEntry', 'url_hash text_hash prompt_hash summary fetched')
+
+
+def digest(text):
+    """Hex SHA-256 of a string, or None for a missing value."""
+    if text is None:
+        return None
+    return hashlib.sha256(str(text).encode('utf-8')).hexdigest()
+
+
+class RunManifest:
+    """
+    Per-row manifest of one output workbook, used by incremental runs.
+
+    For every row it stores hashes of the URL, the article text and the
+    prompt/model settings that produced the summary, the summary itself and
+    when the text was fetched. A rerun compares them with the current input
+    to redo only the rows that changed. The SQLite file is safe to share
+    between threads.
+
+    Args:
+        path (str): SQLite file to open or create, typically one per output workbook.
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS rows ('
+            ' row INTEGER PRIMARY KEY, url_hash TEXT, text_hash TEXT, prompt_hash TEXT, summary TEXT, fetched REAL)')
+        self._db.commit()
+
+    def get(self, rows):
+        """
+        Look up the manifest entries of some rows.
+
+        Args:
+            rows (list): Row labels.
+
+        Returns:
+            dict: Row label -> ManifestEntry, for the rows that have one.
+        """
+        rows = [int(row) for row in rows]
+        entries = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(rows), 900):
+                batch = rows[start:start + 900]
+                query = f"SELECT * FROM rows WHERE row IN ({','.join('?' * len(batch))})"
+                for row, *values in self._db.execute(query, batch):
+                    entries[row] = ManifestEntry(*values)
+        return entries
+
+    def update(self, entries):
+        """
+        Store or replace the entries of some rows.
+
+        Args:
+            entries (dict): Row label -> ManifestEntry.
+        """
+        with self._lock:
+            self._db.executemany('INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?, ?)',
+                                 [(int(row), *entry) for row, entry in entries.items()])
+            self._db.commit()
+
+    def clear(self):
+        """Forget every row, e.g. when the output workbook it describes is gone."""
+        with self._lock:
+            self._db.execute('DELETE FROM rows')
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def is_current(entry, url_hash, prompt_hash, max_age, now=None):
+    """
+    Whether a row's stored summary still stands without fetching or summarizing anything.
+
+    Args:
+        entry (ManifestEntry or None): The row's manifest entry.
+        url_hash (str): Hash of the row's current cleaned URL.
+        prompt_hash (str): Hash of the current prompt and model settings.
+        max_age (float or None): Seconds fetched text stays valid; None for no expiry.
+        now (float or None): Current time; defaults to time.time().
+
+    Returns:
+        bool: True if the URL and prompt are unchanged, a summary exists and the text has not expired.
+    """
+    if entry is None or entry.summary is None:
+        return False
+    if entry.url_hash != url_hash or entry.prompt_hash != prompt_hash:
+        return False
+    return max_age is None or (now or time.time()) - entry.fetched < max_age
@@ -0,0 +1,142 @@
+import collections
+import contextlib
+import csv
+import json
+import math
+import threading
+import time
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of a list of numbers.
+
+    Args:
+        values (list): Observations.
+        q (float): Percentile in [0, 100].
+
+    Returns:
+        float or None: The percentile, or None if there are no observations.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Metrics:
+    """
+    Thread-safe collector of per-stage timings, counters and selector hit rates.
+
+    Stages are free-form names such as 'page_load', 'scrape_http' or
+    'gpt_request'. Every timing is kept as an event row (with its URL and any
+    extra fields) so the run report can include both per-URL detail and
+    p50/p95/p99 summaries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+            self.counters = collections.Counter()
+            self.selectors = collections.defaultdict(lambda: [0, 0])  # domain -> [hits, misses]
+            self.started = time.time()
+
+    def observe(self, stage, seconds, url=None, **fields):
+        """Record one timing for a stage, optionally tied to a URL."""
+        with self._lock:
+            self.events.append(dict(stage=stage, url=url, seconds=seconds, **fields))
+
+    @contextlib.contextmanager
+    def timer(self, stage, url=None, **fields):
+        """Time the enclosed block and record it under `stage`; yields a dict for extra fields."""
+        extra = dict(fields)
+        started = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            self.observe(stage, time.perf_counter() - started, url=url, **extra)
+
+    def incr(self, name, n=1):
+        """Add `n` to a named counter."""
+        with self._lock:
+            self.counters[name] += n
+
+    def selector(self, domain, hit):
+        """Record whether selector extraction found article text on a domain; called once per fetched URL."""
+        with self._lock:
+            self.selectors[domain][0 if hit else 1] += 1
+
+    def drain(self):
+        """
+        Return everything collected so far and reset, e.g. to ship from a worker process.
+
+        Returns:
+            dict: Picklable snapshot accepted by `merge`.
+        """
+        with self._lock:
+            snapshot = dict(events=self.events, counters=dict(self.counters),
+                            selectors={domain: list(v) for domain, v in self.selectors.items()})
+            self.events = []
+            self.counters = collections.Counter()
+            self.selectors = collections.defaultdict(lambda: [0, 0])
+        return snapshot
+
+    def merge(self, snapshot):
+        """Fold a snapshot from `drain` into this collector."""
+        with self._lock:
+            self.events.extend(snapshot['events'])
+            self.counters.update(snapshot['counters'])
+            for domain, (hits, misses) in snapshot['selectors'].items():
+                self.selectors[domain][0] += hits
+                self.selectors[domain][1] += misses
+
+    def summary(self):
+        """
+        Summarize the run.
+
+        Returns:
+            dict: Per-stage count/total/mean/p50/p95/p99 seconds, counters,
+            and selector hit rate by domain.
+        """
+        with self._lock:
+            by_stage = collections.defaultdict(list)
+            for event in self.events:
+                by_stage[event['stage']].append(event['seconds'])
+            stages = {stage: dict(count=len(values), total=sum(values), mean=sum(values) / len(values),
+                                  p50=percentile(values, 50), p95=percentile(values, 95), p99=percentile(values, 99))
+                      for stage, values in sorted(by_stage.items())}
+            selectors = {domain: dict(hits=hits, misses=misses, hit_rate=hits / (hits + misses))
+                         for domain, (hits, misses) in sorted(self.selectors.items())}
+            return dict(started=self.started, wall_seconds=time.time() - self.started,
+                        stages=stages, counters=dict(self.counters), selectors=selectors)
+
+    def write_report(self, path, csv_path=None, **extra):
+        """
+        Write the summary as JSON and, optionally, every timing event as CSV.
+
+        Args:
+            path (str): JSON report path.
+            csv_path (str or None): Per-event CSV path.
+            **extra: Additional JSON-serializable sections (e.g. cache stats).
+        """
+        report = self.summary()
+        report.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        if csv_path:
+            with self._lock:
+                events = list(self.events)
+            fields = ['stage', 'url', 'seconds'] + sorted({k for e in events for k in e} - {'stage', 'url', 'seconds'})
+            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(events)
+
+
+# Process-wide collector used by the scraper, the summarizer and GPT_RAND.respond
+metrics = Metrics()
@@ -8,9 +8,23 @@ from selenium.webdriver.support import expected_conditions as EC
 
 from tqdm import tqdm
 
-from GPT_RAND import respond
-import glob
-import os
+from domain_scheduler import DomainScheduler
+from driver_pool import DriverPool
+from manifest import ManifestEntry, digest, is_current
+from selector_stats import domain_of
+from metrics import metrics
+import http_fetch
+import summarization
+from summarization import articles_summarization
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import queue
+import re
+import threading
+import time
+
+# Seconds Chrome may spend loading one page
+page_load_timeout = 15
 
 # List of site-specific selectors for extracting article content
 site_selectors = [
@@ -50,7 +64,173 @@ default_selectors = [
     (By.CSS_SELECTOR, "div.post-content"),
 ]
 
-def scrape_article(driver, url, debug=False):
+# Domains whose article text only appears after JavaScript runs; these skip the HTTP fast path
+js_rendered_domains = {
+    'proquest.com',
+    # Add more as needed...
+}
+
+# Per-domain politeness for concurrent scraping: fetches in flight and seconds between fetch starts on one site.
+# Failed loads back a domain off further (see DomainScheduler).
+domain_concurrency = 2
+domain_delay = 0.5
+domain_limits = {
+    'proquest.com': dict(concurrency=1, delay=3.0),
+    # Add more as needed...
+}
+
+# Lean Chrome profile: skip everything that is not needed to read <p> text
+lean_profile = True
+lean_chrome_arguments = [
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-dev-shm-usage",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,InterestFeedContentSuggestions,AutofillServerCommunication",
+    "--no-first-run",
+    "--mute-audio",
+    "--autoplay-policy=user-gesture-required",
+]
+# File extensions blocked via CDP: images, fonts and media. Matched at the end of the path, with or
+# without a query string, so hosts such as giffords.org or webmd.com are not caught.
+blocked_resource_extensions = [
+    'png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp',
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+    'mp4', 'webm', 'm3u8', 'mp3', 'm4a', 'ogg', 'wav',
+]
+blocked_resource_patterns = [pattern for ext in blocked_resource_extensions for pattern in (f'*.{ext}', f'*.{ext}?*')]
+# Ad, analytics and widget hosts blocked via CDP
+blocked_host_patterns = [
+    '*doubleclick.net*', '*googlesyndication.com*', '*googletagservices.com*', '*googletagmanager.com*',
+    '*google-analytics.com*', '*adservice.google.*', '*amazon-adsystem.com*', '*adnxs.com*', '*criteo.com*',
+    '*criteo.net*', '*rubiconproject.com*', '*pubmatic.com*', '*openx.net*', '*casalemedia.com*',
+    '*moatads.com*', '*taboola.com*', '*outbrain.com*', '*scorecardresearch.com*', '*quantserve.com*',
+    '*chartbeat.com*', '*chartbeat.net*', '*hotjar.com*', '*nr-data.net*', '*krxd.net*', '*segment.io*',
+    '*connect.facebook.net*', '*platform.twitter.com*', '*imasdk.googleapis.com*', '*jwplayer.com*',
+]
+# Per-domain relaxations for sites that break under the lean profile, e.g.
+# 'example.com': dict(block_resources=False, block_hosts=False)
+lean_profile_overrides = {
+    # Add more as needed...
+}
+
+def site_selector_for(url):
+    """
+    Find the site-specific selector for a URL.
+
+    Args:
+        url (str): The article URL.
+
+    Returns:
+        tuple: (matched domain, selector), or (None, None) if no site matches.
+    """
+    for domain, selector in site_selectors:
+        if domain in url:
+            return domain, selector
+    return None, None
+
+def politeness_key(url):
+    """Domain that politeness limits apply to: the matched `site_selectors` domain, else the host."""
+    if 'www' not in url:
+        # Non-website entries are never fetched; one shared key keeps them out of the domain rotation
+        return ''
+    return site_selector_for(url)[0] or domain_of(web_addy_clean(url))
+
+def domain_scheduler():
+    """
+    Build a DomainScheduler with the module's politeness settings.
+
+    Returns:
+        DomainScheduler: Scheduler keyed by `politeness_key`.
+    """
+    return DomainScheduler(key=politeness_key, concurrency=domain_concurrency, delay=domain_delay,
+                           limits=domain_limits)
+
+def scrape_article_http(url, debug=False):
+    """
+    Scrape the main article text with a plain HTTP GET instead of a browser.
+
+    Uses the same site-specific and default selectors as `scrape_article`.
+
+    Args:
+        url (str): The URL of the article to scrape.
+        debug (bool): If True, print debug information.
+
+    Returns:
+        str or None: The extracted article text, or None if the page needs Selenium.
+    """
+    domain, target = site_selector_for(url)
+    if domain in js_rendered_domains:
+        if debug: print(f"[DEBUG] Domain '{domain}' is JS-rendered; skipping HTTP fetch.")
+        return None
+    selectors = ([target] if target else []) + default_selectors
+    with metrics.timer('scrape_http', url=url, domain=domain_of(url)) as m:
+        article = http_fetch.fetch_article_http(url, selectors, debug=debug)
+        m['ok'] = bool(article)
+    return article
+
+# Evaluates candidate selectors in the page and returns the first non-empty paragraph set,
+# so extraction costs one WebDriver round-trip instead of one per paragraph
+extract_script = """
+const selectors = arguments[0];
+const start = performance.now();
+for (const css of selectors) {
+    let container = null;
+    try { container = document.querySelector(css); } catch (e) { continue; }
+    if (!container) continue;
+    const paragraphs = Array.from(container.querySelectorAll('p'))
+        .map(p => p.innerText.trim())
+        .filter(text => text.length > 0);
+    if (paragraphs.length) return {selector: css, paragraphs: paragraphs, ms: performance.now() - start};
+}
+return {selector: null, paragraphs: [], ms: performance.now() - start};
+"""
+
+def extract_article_script(driver, selectors, timeout=8, debug=False):
+    """
+    Extract article paragraphs with a single `execute_script` call per poll.
+
+    The script is re-run every 0.5s until some selector yields paragraphs or
+    `timeout` expires, which also covers pages that render their text late.
+
+    Args:
+        driver: Selenium WebDriver instance with the page loaded.
+        selectors (list): Selenium (By, value) locators, in priority order.
+        timeout (float): Seconds to keep polling for article text.
+        debug (bool): If True, print debug information.
+
+    Returns:
+        tuple: (winning locator or None, list of paragraph strings).
+    """
+    by_css = {}
+    for selector in selectors:
+        css = http_fetch.selector_css(selector)
+        if css is not None:
+            by_css.setdefault(css, selector)
+    started = time.monotonic()
+    result = {'selector': None, 'paragraphs': [], 'ms': 0}
+    polls = 0
+
+    def probe(d):
+        nonlocal result, polls
+        polls += 1
+        result = d.execute_script(extract_script, list(by_css)) or result
+        return bool(result['paragraphs'])
+
+    try:
+        WebDriverWait(driver, timeout).until(probe)
+    except Exception as e:
+        if debug: print(f"[DEBUG] Script extraction found no paragraphs within {timeout}s: {e}")
+    if debug:
+        print(f"[DEBUG] Script extraction: selector={result['selector']!r}, paragraphs={len(result['paragraphs'])}, "
+              f"polls={polls}, in-page {result['ms']:.1f}ms, total {(time.monotonic() - started) * 1000:.1f}ms")
+    return by_css.get(result['selector']), result['paragraphs']
+
+def scrape_article(driver, url, debug=False, stats=None, extract='script', outcome=None):
     """
     Scrape the main article text from a given URL using Selenium.
 
@@ -58,6 +238,15 @@ def scrape_article(driver, url, debug=False):
         driver: Selenium WebDriver instance.
         url (str): The URL of the article to scrape.
         debug (bool): If True, print debug information.
+        stats (SelectorStats or None): If set, default selectors are tried in the
+            order learned for this domain, a reliably successful one is used like a
+            site-specific selector, and every probe is recorded.
+        extract (str): 'script' evaluates all selectors in one `execute_script` call
+            per poll; 'elements' waits for each selector and reads paragraphs one
+            WebDriver call at a time.
+        outcome (dict or None): If set, `outcome['loaded']` records whether the page
+            loaded, so a load failure or timeout can be told apart from a page that
+            loaded without article text.
 
     Returns:
         str or None: The extracted article text, or None if not found.
@@ -65,31 +254,61 @@ def scrape_article(driver, url, debug=False):
     article_text = []
     wait = 0
     found = False
+    host = domain_of(url)
     if debug:
         print("="*80)
         print(f"[DEBUG] Starting scrape_article for URL: {url}")
     try:
-        if debug: print(f"[DEBUG] Setting page load timeout to 15 seconds.")
+        if debug: print(f"[DEBUG] Setting page load timeout to {page_load_timeout} seconds.")
+        started = time.perf_counter()
         try:
-            driver.set_page_load_timeout(15)
+            driver.set_page_load_timeout(page_load_timeout)
+            apply_lean_profile(driver, url, debug)
             if debug: print(f"[DEBUG] Attempting driver.get({url})")
             driver.get(url)
             if debug: print(f"[DEBUG] Page loaded successfully for {url}")
         except Exception as e:
             #print(f"[ERROR] Page load failed for {url}: {e}")
+            metrics.observe('page_load', time.perf_counter() - started, url=url, domain=host, ok=False)
+            if outcome is not None:
+                outcome['loaded'] = False
             return None
+        metrics.observe('page_load', time.perf_counter() - started, url=url, domain=host, ok=True)
+        if outcome is not None:
+            outcome['loaded'] = True
+        extract_started = time.perf_counter()
 
         # Site-specific selectors
-        target = None
-        for domain, selector in site_selectors:
-            if domain in url:
-                if debug: print(f"[DEBUG] Matched domain '{domain}' in URL. Using site-specific selector: {selector}")
-                target = selector
-                break
-        if not target and debug:
-            print(f"[DEBUG] No site-specific selector matched for {url}")
-
-        if target:
+        domain, target = site_selector_for(url)
+        if debug:
+            if target:
+                print(f"[DEBUG] Matched domain '{domain}' in URL. Using site-specific selector: {target}")
+            else:
+                print(f"[DEBUG] No site-specific selector matched for {url}")
+
+        candidates = default_selectors
+        if stats is not None:
+            candidates = stats.ranked(host, default_selectors)
+            if not target:
+                target = stats.pinned(host, default_selectors)
+                if target and debug: print(f"[DEBUG] Using learned selector for '{host}': {target}")
+
+        if extract == 'script':
+            started = time.monotonic()
+            selectors = ([target] if target else []) + [sel for sel in candidates if sel != target]
+            winner, article_text = extract_article_script(driver, selectors, debug=debug)
+            found = bool(article_text)
+            if stats is not None:
+                # Every selector ahead of the winner (or all, on failure) was evaluated and came up empty in
+                # the same script call, at no cost of its own; the time spent polling belongs to the winner.
+                elapsed = time.monotonic() - started
+                for sel in selectors:
+                    if sel == winner:
+                        stats.record(host, sel, True, len(article_text), elapsed)
+                        break
+                    stats.record(host, sel, False, 0, 0.0)
+        elif target:
+            started = time.monotonic()
             try:
                 if debug: print(f"[DEBUG] Waiting up to 8s for site-specific selector: {target}")
                 WebDriverWait(driver, 8).until(
@@ -105,11 +324,16 @@ def scrape_article(driver, url, debug=False):
                 if debug: print(f"[DEBUG] Site-specific selector extraction {'succeeded' if found else 'failed'} (found {len(article_text)} paragraphs).")
             except Exception as e:
                 if debug: print(f"[ERROR] Site-specific selector failed: {e}")
+            if stats is not None:
+                stats.record(host, target, found, len(article_text), time.monotonic() - started)
 
         # Default selectors
-        if not found:
+        if not found and extract != 'script':
             if debug: print(f"[DEBUG] Trying default selectors for {url}")
-            for idx, sel in enumerate(default_selectors):
+            for idx, sel in enumerate(candidates):
+                if sel == target:
+                    continue
+                started = time.monotonic()
                 try:
                     linger = 0.5 if wait >= 7 else 7
                     wait += linger
@@ -131,6 +355,9 @@ def scrape_article(driver, url, debug=False):
                 except Exception as e:
                     if debug: print(f"[ERROR] Default selector {sel} failed: {e}")
                     continue
+                finally:
+                    if stats is not None:
+                        stats.record(host, sel, found, len(article_text) if found else 0, time.monotonic() - started)
 
         # Readability fallback (optional, currently commented out)
         # if not found:
@@ -147,6 +374,8 @@ def scrape_article(driver, url, debug=False):
         #     except Exception as e:
         #         if debug: print(f"[ERROR] Readability failed: {e}")
 
+        metrics.observe('extract', time.perf_counter() - extract_started, url=url, domain=host, ok=found, mode=extract)
+
     except Exception as e:
         tqdm.write(f"[ERROR] Error scraping {url}: {e}")
 
@@ -156,7 +385,75 @@ def scrape_article(driver, url, debug=False):
     full_article = "\n\n".join(article_text) if article_text else None
     return full_article
 
-def scrape_articles_from_list(url_list, debug=False, restart_driver=False):
+def chrome_options(lean=None):
+    """
+    Build the ChromeOptions used for every scraping driver.
+
+    The lean profile returns from `driver.get` once the DOM is parsed (the
+    extraction step already polls for the article container), and turns off
+    browser features a scraper never uses. Resource blocking is applied per
+    page by `apply_lean_profile`.
+
+    Args:
+        lean (bool or None): Use the lean profile; defaults to `lean_profile`.
+
+    Returns:
+        Options: Headless Chrome options.
+    """
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--window-size=1920,1080")
+    if not (lean_profile if lean is None else lean):
+        return options
+    options.page_load_strategy = 'eager'
+    for argument in lean_chrome_arguments:
+        options.add_argument(argument)
+    options.add_experimental_option('prefs', {
+        'profile.default_content_setting_values.notifications': 2,
+        'profile.default_content_setting_values.geolocation': 2,
+        'profile.default_content_setting_values.media_stream': 2,
+    })
+    return options
+
+def _wildcard_match(pattern, url):
+    """Whether a CDP URL pattern, where `*` matches any run of characters, matches a whole URL."""
+    return re.fullmatch('.*'.join(map(re.escape, pattern.split('*'))), url) is not None
+
+def apply_lean_profile(driver, url, debug=False):
+    """
+    Block the resources the lean profile skips for the page about to be loaded.
+
+    Sends `Network.setBlockedURLs` over the Chrome DevTools Protocol, and only
+    when the blocked list differs from the one already set on this driver.
+    The blocked URLs apply to the page request too, so patterns that match
+    `url` itself are left out. Domains in `lean_profile_overrides` can keep
+    resource types or hosts that they need. Drivers without CDP support are
+    left unchanged.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        url (str): URL that will be loaded next.
+        debug (bool): If True, print debug information.
+    """
+    if not lean_profile or not hasattr(driver, 'execute_cdp_cmd'):
+        return
+    override = lean_profile_overrides.get(politeness_key(url), {})
+    blocked = ((blocked_resource_patterns if override.get('block_resources', True) else [])
+               + (blocked_host_patterns if override.get('block_hosts', True) else []))
+    # Never block the article itself
+    blocked = [pattern for pattern in blocked if not _wildcard_match(pattern, url)]
+    if getattr(driver, 'blocked_urls', None) == blocked:
+        return
+    try:
+        if not hasattr(driver, 'blocked_urls'):
+            driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked})
+        driver.blocked_urls = blocked
+    except Exception as e:
+        if debug: print(f"[DEBUG] Could not set blocked URLs: {e}")
+
+def scrape_articles_from_list(url_list, debug=False, restart_driver=False, workers=None, max_pages=50, http_first=True, cache=None,
+                              stats=None):
     """
     Scrape articles from a list of URLs.
 
@@ -164,18 +461,28 @@ def scrape_articles_from_list(url_list, debug=False, restart_driver=False):
         url_list (list): List of article URLs.
         debug (bool): If True, print debug information.
         restart_driver (bool): If True, restart the Selenium driver for each URL.
+            Ignored when `workers` is set.
+        workers (int or None): If set, scrape concurrently with a pool of this
+            many reusable Chrome drivers.
+        max_pages (int): Pages a pooled driver serves before it is recycled.
+        http_first (bool): If True, try a plain HTTP fetch first and only start
+            Chrome when that finds no article text.
+        cache (ArticleCache or None): If set, cached article text is reused and
+            newly scraped text is stored.
+        stats (SelectorStats or None): Per-domain selector statistics used and updated
+            by `scrape_article`.
 
     Returns:
-        list: List of article texts (or None if not found).
+        list: List of article texts (or None if not found), in input order.
     """
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
+    options = chrome_options()
+
+    if workers:
+        return _scrape_with_pool(list(url_list), options, workers, max_pages, debug, http_first, cache, stats)
 
     results = [None] * len(url_list)
+    # Started lazily so runs served entirely over HTTP never launch Chrome.
     driver = None
-    if not restart_driver:
-        driver = webdriver.Chrome(options=options)
 
     try:
         for idx, url in enumerate(tqdm(url_list, desc="Scraping articles")):
@@ -183,20 +490,32 @@ def scrape_articles_from_list(url_list, debug=False, restart_driver=False):
                 if debug:
                     print(f"\n{'#'*80}\n[DEBUG] Scraping article {idx+1}/{len(url_list)}: {url}")
                 url = web_addy_clean(url)
-                try:
-                    if restart_driver:
-                        driver = webdriver.Chrome(options=options)
-                    article = scrape_article(driver, url, debug)
-                except Exception as e:
-                    print(f"[ERROR] Critical error, restarting driver: {e}")
-                    if driver:
+                article = cache.get_article(url) if cache else None
+                if article:
+                    results[idx] = article
+                    continue
+                page = {}
+                if http_first:
+                    article = scrape_article_http(url, debug)
+                if not article:
+                    try:
+                        if restart_driver or driver is None:
+                            driver = webdriver.Chrome(options=options)
+                        article = scrape_article(driver, url, debug, stats, outcome=page)
+                    except Exception as e:
+                        print(f"[ERROR] Critical error, restarting driver: {e}")
+                        if driver:
+                            driver.quit()
+                        if not restart_driver:
+                            driver = webdriver.Chrome(options=options)
+                        article = scrape_article(driver, url, debug, stats, outcome=page)
+                    if restart_driver and driver:
                         driver.quit()
-                    if not restart_driver:
-                        driver = webdriver.Chrome(options=options)
-                    article = scrape_article(driver, url, debug)
+                        driver = None
+                _record_extraction(url, article, page)
+                if cache and article:
+                    cache.put_article(url, article)
                 results[idx] = article
-                if restart_driver and driver:
-                    driver.quit()
             else:
                 if debug:
                     print(f"[DEBUG] Skipping non-website entry at index {idx+1}: {url}")
@@ -207,6 +526,211 @@ def scrape_articles_from_list(url_list, debug=False, restart_driver=False):
             driver.quit()
     return results
 
+def _scrape_with_pool(url_list, options, workers, max_pages, debug=False, http_first=True, cache=None, stats=None):
+    """
+    Scrape URLs concurrently using a DriverPool, preserving input order.
+
+    Work is handed out by a `domain_scheduler()`, so domains are interleaved and
+    each one's politeness limits hold however many workers are running.
+
+    Args:
+        url_list (list): List of article URLs.
+        options: ChromeOptions for the pooled drivers.
+        workers (int): Number of pooled drivers and worker threads.
+        max_pages (int): Pages a driver serves before it is recycled.
+        debug (bool): If True, print debug information.
+        http_first (bool): If True, try a plain HTTP fetch before taking a driver.
+        cache (ArticleCache or None): Article cache consulted before scraping.
+        stats (SelectorStats or None): Per-domain selector statistics.
+
+    Returns:
+        list: List of article texts (or None if not found), in input order.
+    """
+    results = [None] * len(url_list)
+    scheduler = domain_scheduler()
+    for idx, url in enumerate(url_list):
+        scheduler.put((idx, url), url)
+
+    with DriverPool(workers, options, max_pages=max_pages, debug=debug) as pool, \
+            tqdm(total=len(url_list), desc="Scraping articles") as pbar:
+        def worker():
+            while True:
+                item = scheduler.take()
+                if item is None:
+                    return
+                idx, url = item
+                try:
+                    results[idx] = _scrape_pooled(pool, url, debug, http_first, cache, stats, scheduler)
+                except Exception as e:
+                    tqdm.write(f"[ERROR] Error scraping {url}: {e}")
+                pbar.update()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+    return results
+
+def _record_extraction(url, article, page):
+    """Count one selector hit or miss per fetched URL, served by HTTP or Chrome; pages that never loaded are skipped."""
+    if article or page.get('loaded'):
+        metrics.selector(domain_of(url), bool(article))
+
+def _scrape_pooled(pool, url, debug=False, http_first=True, cache=None, stats=None, scheduler=None):
+    """
+    Scrape one URL, borrowing a driver from `pool` only if the HTTP path fails.
+
+    Args:
+        pool (DriverPool): Pool of Chrome drivers.
+        url (str): Raw URL entry from the input sheet.
+        debug (bool): If True, print debug information.
+        http_first (bool): If True, try a plain HTTP fetch before taking a driver.
+        cache (ArticleCache or None): Article cache consulted before scraping.
+        stats (SelectorStats or None): Per-domain selector statistics.
+        scheduler (DomainScheduler or None): If set, the fetch waits for a slot on the
+            URL's domain and reports its outcome. Only a page that failed to load or
+            timed out counts as a failure there, not one without article text. Cache
+            hits skip it.
+
+    Returns:
+        str or None: The article text, the 'Not a website.' marker, or None if not found.
+    """
+    if 'www' not in url:
+        if debug: print(f"[DEBUG] Skipping non-website entry: {url}")
+        return 'Not a website. ' + url
+    url = web_addy_clean(url)
+    if debug: print(f"\n{'#'*80}\n[DEBUG] Scraping article: {url}")
+    article = cache.get_article(url) if cache else None
+    if article:
+        return article
+    with scheduler.slot(url) if scheduler else contextlib.nullcontext({}) as fetch:
+        page = {}
+        if http_first:
+            article = scrape_article_http(url, debug)
+        # One retry on a fresh driver mirrors the sequential restart-on-crash behaviour.
+        for attempt in range(0 if article else 2):
+            with metrics.timer('driver_wait', url=url):
+                driver = pool.acquire()
+            try:
+                article = scrape_article(driver, url, debug, stats, outcome=page)
+            except Exception as e:
+                tqdm.write(f"[ERROR] Critical error, recycling driver: {e}")
+                pool.release(driver, crashed=True)
+                continue
+            pool.release(driver)
+            break
+        # A page that loaded but had no recognizable article is the site's layout, not a sign of
+        # throttling, so only load failures, timeouts and crashed drivers back the domain off.
+        fetch['ok'] = bool(article) or page.get('loaded', False)
+    _record_extraction(url, article, page)
+    if cache and article:
+        cache.put_article(url, article)
+    return article
+
+def stream_scrape_summ(url_list, debug=False, workers=4, summarizers=8, queue_size=16, max_pages=50, http_first=True, cache=None,
+                       stats=None):
+    """
+    Scrape and summarize URLs as a streaming pipeline.
+
+    Scraper threads feed articles into a bounded queue that summarizer threads
+    drain, so both stages run at once and a full queue pauses the scrapers.
+    URLs are handed to the scrapers by a `domain_scheduler()`, which interleaves
+    domains and enforces their politeness limits. Article texts are dropped as
+    soon as they are summarized. Exact and
+    near-duplicate articles are summarized once (see `summarization.deduped_summarizer`).
+    Closing the generator early stops and joins the threads and quits the drivers.
+
+    Args:
+        url_list (list): List of article URLs.
+        debug (bool): If True, print debug information.
+        workers (int): Number of scraper threads and pooled Chrome drivers.
+        summarizers (int): Number of concurrent summarization threads.
+        queue_size (int): Maximum scraped articles waiting for a summarizer.
+        max_pages (int): Pages a pooled driver serves before it is recycled.
+        http_first (bool): If True, try a plain HTTP fetch before taking a driver.
+        cache (ArticleCache or None): Cache consulted for both articles and summaries.
+        stats (SelectorStats or None): Per-domain selector statistics.
+
+    Yields:
+        tuple: (index into url_list, whether article text was found, summary or None),
+        in completion order.
+    """
+    url_list = list(url_list)
+    workers = workers or 1
+    pending = domain_scheduler()
+    for item in enumerate(url_list):
+        pending.put(item, item[1])
+    articles = queue.Queue(maxsize=queue_size)
+    done = queue.Queue()
+    # Duplicate articles (syndicated copies, reposts) are summarized once
+    summarize = summarization.deduped_summarizer(debug, cache)
+    # Set when the consumer stops early (an exception or interrupt while writing), so the threads wind down
+    stop = threading.Event()
+
+    def put(item):
+        # A full queue is rechecked now and then, so a stop is never missed while blocked
+        while not stop.is_set():
+            try:
+                articles.put(item, timeout=0.2)
+                return
+            except queue.Full:
+                pass
+
+    def scrape_worker(pool):
+        while not stop.is_set():
+            item = pending.take()
+            if item is None:
+                return
+            idx, url = item
+            try:
+                article = _scrape_pooled(pool, url, debug, http_first, cache, stats, pending)
+            except Exception as e:
+                if stop.is_set():
+                    return
+                tqdm.write(f"[ERROR] Error scraping {url}: {e}")
+                article = None
+            put((idx, article))
+
+    def summarize_worker():
+        while not stop.is_set():
+            try:
+                item = articles.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is None:
+                return
+            idx, article = item
+            try:
+                summary = summarize(idx, article) if article else None
+            except Exception as e:
+                # Every item must reach `done`, or the consumer below waits forever
+                tqdm.write(f"[ERROR] Error summarizing {url_list[idx]}: {e}")
+                summary = None
+            done.put((idx, bool(article), summary))
+
+    with DriverPool(workers, chrome_options(), max_pages=max_pages, debug=debug) as pool:
+        scrapers = [threading.Thread(target=scrape_worker, args=(pool,), daemon=True) for _ in range(workers)]
+        consumers = [threading.Thread(target=summarize_worker, daemon=True) for _ in range(summarizers)]
+        for thread in scrapers + consumers:
+            thread.start()
+
+        def close_articles():
+            for thread in scrapers:
+                thread.join()
+            for _ in consumers:
+                put(None)
+
+        closer = threading.Thread(target=close_articles, daemon=True)
+        closer.start()
+        try:
+            for _ in tqdm(range(len(url_list)), desc="Scraping and summarizing"):
+                yield done.get()
+        finally:
+            # Closing the pool first makes scrapers waiting for a driver give up instead of starting Chrome
+            stop.set()
+            pool.close()
+            for thread in scrapers + consumers + [closer]:
+                thread.join()
+
 def web_addy_clean(text):
     """
     Clean a web address string by removing anything after a semicolon.
@@ -223,39 +747,97 @@ def web_addy_clean(text):
         web_add = text
     return web_add
 
-def articles_summarization(articles, debug=False):
+def search_mask(df):
+    """
+    Rows to process for the `mask` of `select_rows`: every row whose Search flag is not 1.
+
+    Rows with Search == 1 are skipped; without a Search column every row is eligible.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+
+    Returns:
+        pd.Series or None: Boolean mask, or None if `df` has no Search column.
+    """
+    return (df.Search != 1) if 'Search' in df else None
+
+def select_rows(df, url_col='Source_coding_info', sum_col='Case_summary', mask=None, overwrite=False):
+    """
+    Choose the rows of a DataFrame that need scraping and summarizing.
+
+    The DataFrame is not copied; summaries are later written into it in place.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        url_col (str): Column name containing URLs.
+        sum_col (str): Column name for summaries.
+        mask (pd.Series or None): Boolean mask for rows to process.
+        overwrite (bool): If True, overwrite existing summaries.
+
+    Returns:
+        tuple: (DataFrame to update and write out, Series of URLs to process indexed by row label).
+    """
+    if not overwrite:
+        mask_empty = df[sum_col].isna()
+        mask = mask_empty if mask is None else mask & mask_empty
+    if df[sum_col].dtype != object:
+        # An all-empty summary column loads as float64, which rejects summary strings
+        df[sum_col] = df[sum_col].astype(object)
+    urls = df[url_col] if mask is None else df.loc[mask, url_col]
+    return df, urls
+
+def clean_urls(urls):
+    """
+    Vectorized `web_addy_clean` and web/non-web classification of URL entries.
+
+    Args:
+        urls (pd.Series): Raw URL entries from the input sheet.
+
+    Returns:
+        tuple: (Series of cleaned entries, with <NA> for missing ones,
+        boolean Series marking website entries).
     """
-    Summarize a list of articles using the GPT_RAND.respond.Summarize function.
+    raw = urls.astype('string').str.strip()
+    is_web = raw.str.contains('www', regex=False).fillna(False).astype(bool)
+    has_sep = raw.str.contains('; ', regex=False).fillna(False).astype(bool)
+    cleaned = raw.mask(is_web & has_sep, raw.str.split(';', n=1).str[0])
+    return cleaned, is_web
+
+def plan_work(urls, debug=False):
+    """
+    Reduce the rows to process to the distinct URLs that need fetching.
+
+    Entries are cleaned and deduplicated, so a URL listed on several rows is
+    scraped and summarized once; empty entries are dropped.
 
     Args:
-        articles (list): List of article texts.
+        urls (pd.Series): Raw URL entries indexed by row label.
         debug (bool): If True, print debug information.
 
     Returns:
-        list: List of summaries.
-    """
-    context = '''
-    Be direct. Very succinctly summarize the incident that occured in the following article, at a high-level, making sure to include all the relevant facts, entities, locations, actions and times that are relevant to the violent incident.
-    You do not necessarily need to shorten it if it is already pretty breif. You do not need to capture the articles intent, perspective or tone, just mostly the facts of the occurence. 
-    '''
-    summaries = [None]*len(articles)
-
-    for j, article in enumerate(tqdm(articles, desc='Summarizing articles')):
-        if article: 
-            if debug:
-                print(article[:])
-                print(''.join(['#']*80))
-            try:
-                summary = respond.Summarize(article, context=context, T=.3, C=1, N=1, print_rslt=False, GPT='4om')
-                summaries[j] = summary[0]
-            except Exception as e:
-                tqdm.write(f"[ERROR] Error summarizing {article}: {e}")
-            if debug: print(summary)
-    return summaries
+        tuple: (list of distinct cleaned URLs in first-seen order,
+        list of the row labels each one fans out to).
+    """
+    cleaned, is_web = clean_urls(urls)
+    present = cleaned.notna() & (cleaned != '')
+    cleaned = cleaned[present]
+    codes, uniques = pd.factorize(cleaned)
+    members = cleaned.groupby(codes, sort=False).groups
+    groups = [members[code] for code in range(len(uniques))]
+    metrics.incr('rows_selected', len(urls))
+    metrics.incr('rows_duplicate_url', len(cleaned) - len(uniques))
+    metrics.incr('rows_non_web', int((~is_web[present]).sum()))
+    if debug:
+        print(f"[DEBUG] {len(urls)} rows -> {len(uniques)} distinct URLs "
+              f"({int((~present).sum())} empty, {int((~is_web[present]).sum())} non-web)")
+    return list(uniques), groups
 
-def scrape_n_summ(df, url_col='Source_coding_info', sum_col='Case_summary', mask=None, overwrite=False, debug=False):
+def scrape_n_summ(df, url_col='Source_coding_info', sum_col='Case_summary', mask=None, overwrite=False, debug=False, workers=4, concurrency=8, pipeline=False, cache=None,
+                 journal=None, flush=None, flush_every=50, stats=None, batch_tokens=None):
     """
-    Scrape and summarize articles for a DataFrame, updating the summary column.
+    Scrape and summarize articles for a DataFrame, updating the summary column in place.
+
+    Rows that share a URL are scraped and summarized once.
 
     Args:
         df (pd.DataFrame): Input DataFrame.
@@ -264,61 +846,205 @@ def scrape_n_summ(df, url_col='Source_coding_info', sum_col='Case_summary', mask
         mask (pd.Series or None): Boolean mask for rows to process.
         overwrite (bool): If True, overwrite existing summaries.
         debug (bool): If True, print debug information.
+        workers (int or None): Size of the Chrome driver pool used for scraping.
+            If None, each URL is scraped with a freshly started driver.
+        concurrency (int): Maximum summarization requests in flight.
+        pipeline (bool): If True, stream articles from the scrapers straight into
+            the summarizers and write each summary as soon as it is ready.
+        cache (ArticleCache or None): Cache consulted for both articles and summaries.
+        journal (JobJournal or None): If set, rows it marks as summarized are skipped
+            and each row's scrape and summary outcome is appended to it.
+        flush (callable or None): Called with the partially updated DataFrame every
+            `flush_every` rows, e.g. to write interim output.
+        flush_every (int): Rows between journal-driven flushes.
+        stats (SelectorStats or None): Per-domain selector statistics used while scraping.
+        batch_tokens (int or None): Token budget for packing several articles into one
+            summarization request (batch mode only; ignored with `pipeline`).
 
     Returns:
         pd.DataFrame: DataFrame with updated summaries.
     """
-    # Example: process a subset for testing; remove or adjust for production
-    df = df.iloc[100:115]
-    if not overwrite:
-        mask_filled = (~df[sum_col].isna())
-        if mask is not None:
-            mask = mask & mask_filled
-        else:
-            mask = mask_filled
-            
-    df_ = df.copy()
-    if mask is not None:
-        urls = df_.loc[mask, url_col]
-    else:
-        urls = df_[url_col]
+    df_, urls = select_rows(df, url_col, sum_col, mask, overwrite)
 
-    articles = scrape_articles_from_list(urls, debug=debug, restart_driver=True)
-    summaries = articles_summarization(articles, debug=debug)
+    if journal is not None:
+        finished = journal.completed()
+        resumed = urls.index[urls.index.isin(list(finished))]
+        for label in resumed:
+            df_.loc[label, sum_col] = finished[label]
+        urls = urls.drop(resumed)
+        if debug: print(f"[DEBUG] Resuming: {len(resumed)} rows already summarized, {len(urls)} to go.")
+    unique, groups = plan_work(urls, debug)
 
-    if mask is not None:
-        df_.loc[mask, sum_col] = summaries
-    else:
-        df_[sum_col] = summaries
+    def write(i, scraped, summary):
+        # Fan one URL's result out to every row that lists it
+        df_.loc[groups[i], sum_col] = summary
+        if journal is not None:
+            for label in groups[i]:
+                journal.record(label, 'scrape', 'ok' if scraped else 'failed')
+                journal.record(label, 'summary', 'ok' if summary is not None else 'failed', summary=summary)
+
+    if pipeline:
+        stream = stream_scrape_summ(unique, debug=debug, workers=workers, summarizers=concurrency, cache=cache,
+                                    stats=stats)
+        # Closed on the way out, so a failed write or an interrupt stops the pipeline's threads and drivers
+        with contextlib.closing(stream):
+            for n, (i, scraped, summary) in enumerate(stream, 1):
+                write(i, scraped, summary)
+                if flush is not None and n % flush_every == 0:
+                    flush(df_)
+        return df_
+
+    # Without a journal or flush target there is nothing to checkpoint, so do one batch.
+    step = flush_every if (journal is not None or flush is not None) else max(len(unique), 1)
+    for start in range(0, len(unique), step):
+        chunk = unique[start:start + step]
+        articles = scrape_articles_from_list(chunk, debug=debug, restart_driver=True, workers=workers, cache=cache,
+                                             stats=stats)
+        summaries = articles_summarization(articles, debug=debug, concurrency=concurrency, cache=cache,
+                                           batch_tokens=batch_tokens)
+        for i, article, summary in zip(range(start, start + len(chunk)), articles, summaries):
+            write(i, article, summary)
+        if flush is not None:
+            flush(df_)
+
+    return df_
+
+def refresh_rows(df, manifest, url_col='Source_coding_info', sum_col='Case_summary', mask=None, overwrite=False,
+                 debug=False, workers=4, concurrency=8, cache=None, stats=None, max_age=30 * 24 * 3600):
+    """
+    Incrementally update the summary column of a DataFrame against a RunManifest.
+
+    Rows whose cleaned URL and prompt/model settings match their manifest entry,
+    and whose text was fetched less than `max_age` seconds ago, get the stored
+    summary without any fetching. The fetch time recorded for text served by
+    the article cache is that of its cache entry, so it still expires on time. The other rows are scraped (the article cache
+    still serves text it holds) and re-summarized only if their article text or
+    the prompt changed. A failed scrape keeps the previous summary of an
+    unchanged URL and leaves its manifest entry as it was, so the next run
+    retries it.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame.
+        manifest (RunManifest): Manifest of the output workbook; updated for every redone row.
+        url_col (str): Column name containing URLs.
+        sum_col (str): Column name for summaries.
+        mask (pd.Series or None): Boolean mask for rows to process.
+        overwrite (bool): If True, also process rows whose input summary is filled.
+        debug (bool): If True, print debug information.
+        workers (int or None): Size of the Chrome driver pool used for scraping.
+        concurrency (int): Maximum summarization requests in flight.
+        cache (ArticleCache or None): Cache consulted for both articles and summaries.
+        stats (SelectorStats or None): Per-domain selector statistics used while scraping.
+        max_age (float or None): Seconds fetched text stays valid, normally the cache TTL.
+
+    Returns:
+        tuple: (DataFrame with updated summaries, list of row labels whose summary or URL changed).
+    """
+    df_, urls = select_rows(df, url_col, sum_col, mask, overwrite)
+    cleaned, _ = clean_urls(urls)
+    url_hashes = {label: None if pd.isna(url) else digest(url) for label, url in cleaned.items()}
+    prompt_hash = summarization.prompt_fingerprint()
+    known = manifest.get(list(urls.index))
+    now = time.time()
+    current = [label for label in urls.index
+               if is_current(known.get(label), url_hashes[label], prompt_hash, max_age, now)]
+    for label in current:
+        df_.loc[label, sum_col] = known[label].summary
+    metrics.incr('rows_unchanged', len(current))
+    if debug: print(f"[DEBUG] Incremental: {len(current)} rows unchanged, {len(urls) - len(current)} to check.")
+    unique, groups = plan_work(urls.drop(current), debug)
+
+    articles = scrape_articles_from_list(unique, debug=debug, restart_driver=True, workers=workers, cache=cache,
+                                         stats=stats)
+    text_hashes = [digest(article) if article else None for article in articles]
+    # Text served by the article cache is as old as its cache entry, not this run
+    fetched = [(cache.fetched_at(web_addy_clean(url)) if cache and article else None) or now
+               for url, article in zip(unique, articles)]
+
+    def reusable(label, i):
+        entry = known.get(label)
+        return (entry is not None and entry.summary is not None and entry.text_hash == text_hashes[i]
+                and entry.prompt_hash == prompt_hash)
+
+    # Only articles whose text or prompt changed for at least one of their rows are summarized again
+    stale = [i for i, group in enumerate(groups) if articles[i] and not all(reusable(label, i) for label in group)]
+    summaries = dict(zip(stale, articles_summarization([articles[i] for i in stale], debug=debug,
+                                                       concurrency=concurrency, cache=cache)))
+    metrics.incr('rows_resummarized', sum(len(groups[i]) for i in stale))
+
+    changed, entries = [], {}
+    for i, group in enumerate(groups):
+        for label in group:
+            entry = known.get(label)
+            if not articles[i] and entry is not None and entry.url_hash == url_hashes[label]:
+                df_.loc[label, sum_col] = entry.summary
+                continue
+            if i in summaries:
+                summary = summaries[i]
+            else:
+                summary = entry.summary if reusable(label, i) else None
+            df_.loc[label, sum_col] = summary
+            entries[label] = ManifestEntry(url_hashes[label], text_hashes[i], prompt_hash, summary, fetched[i])
+            if entry is None or entry.summary != summary or entry.url_hash != url_hashes[label]:
+                changed.append(label)
+    manifest.update(entries)
+    metrics.incr('rows_changed', len(changed))
+    return df_, changed
+
+def scrape_rows(df, url_col='Source_coding_info', text_col='Article_text', mask=None, overwrite=False, debug=False,
+                workers=4, cache=None, stats=None):
+    """
+    Scrape article text for a DataFrame without summarizing it.
 
+    Rows that share a URL are scraped once.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame, updated in place.
+        url_col (str): Column name containing URLs.
+        text_col (str): Column name for the article text.
+        mask (pd.Series or None): Boolean mask for rows to process.
+        overwrite (bool): If True, re-scrape rows that already have text.
+        debug (bool): If True, print debug information.
+        workers (int or None): Size of the Chrome driver pool used for scraping.
+        cache (ArticleCache or None): Article cache consulted before scraping.
+        stats (SelectorStats or None): Per-domain selector statistics used while scraping.
+
+    Returns:
+        pd.DataFrame: DataFrame with the article text column filled in.
+    """
+    if text_col not in df:
+        df[text_col] = None
+    df_, urls = select_rows(df, url_col, text_col, mask, overwrite)
+    unique, groups = plan_work(urls, debug)
+    articles = scrape_articles_from_list(unique, debug=debug, restart_driver=True, workers=workers, cache=cache,
+                                         stats=stats)
+    for labels, article in zip(groups, articles):
+        df_.loc[labels, text_col] = article
     return df_
 
-# --- MAIN SCRIPT: Process all Excel files in a directory and output results ---
-
-# Directory containing Excel files
-input_dir = 'Data/'
-output_dir = 'Data/Processed/'
-
-# Find all Excel files in the directory
-print('arrived')
-
-excel_files = glob.glob(os.path.join(input_dir, '*.xlsx'))
-print(len(excel_files))
-
-for file_path in excel_files:
-    # Read the Excel file
-    df = pd.read_excel(file_path)
-    print(df)
-    # Example mask: only process rows where Search == 1
-    mask_unsum = (df.Search != 1)
-    # Scrape and summarize
-    print(mask_unsum)
-    df_ = scrape_n_summ(df, url_col='Source_coding_info', sum_col='Case_summary', mask=mask_unsum, overwrite=False)
-    # Construct output filename
-    print(4)
-    base = os.path.basename(file_path)
-    name, ext = os.path.splitext(base)
-    output_path = os.path.join(output_dir, f"{name}_summary_appended{ext}")
-    # Save the updated DataFrame
-    df_.to_excel(output_path, index=False)
-    print(f"Processed and saved: {output_path}")
+def configure(model=None, timeout=None, page_timeout=None, dedupe=None, lean=None, rpm=None, tpm=None):
+    """
+    Override run settings: summarization model, request timeout, duplicate threshold and rate limits, and the page
+    load timeout and Chrome profile.
+
+    Args:
+        model (str or None): Key of `respond.Deployment`, e.g. '4om'.
+        timeout (float or None): Seconds to wait for one GPT response.
+        page_timeout (float or None): Seconds Chrome may spend loading one page.
+        dedupe (float or None): Similarity at which articles share a summary; 0 disables deduplication.
+        lean (bool or None): Whether Chrome uses the lean profile (see `chrome_options`).
+        rpm (int or None): GPT requests-per-minute limit.
+        tpm (int or None): GPT tokens-per-minute limit.
+    """
+    global page_load_timeout, lean_profile
+    summarization.configure(model, timeout, dedupe, rpm, tpm)
+    if page_timeout is not None:
+        page_load_timeout = page_timeout
+    if lean is not None:
+        lean_profile = lean
+
+# Kept so `python scrape_and_summ.py [options]` still runs the full job; see cli.py
+if __name__ == '__main__':
+    import sys
+    from cli import main
+    main(['run'] + sys.argv[1:])
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+from urllib.parse import urlparse
+
+
+def domain_of(url):
+    """
+    Reduce a URL to the host name used for per-domain statistics.
+
+    Args:
+        url (str): Article URL.
+
+    Returns:
+        str: Lower-cased host without a leading 'www.'.
+    """
+    host = urlparse(url).netloc.lower() or url.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def selector_key(selector):
+    """Serialize a Selenium (By, value) locator for storage."""
+    return f"{selector[0]}={selector[1]}"
+
+
+class SelectorStats:
+    """
+    Persistent per-domain record of which selectors found article text.
+
+    Every selector probe in `scrape_article` is recorded with its outcome,
+    paragraph count and wait time. The scraper uses the history to try the
+    selectors most likely to succeed first, and to pin a selector for domains
+    where one has proven reliable, giving them site_selectors-style treatment.
+
+    Args:
+        path (str): SQLite file to open or create.
+        min_successes (int): Successes needed before a selector can be pinned.
+        min_rate (float): Success rate needed before a selector can be pinned.
+    """
+
+    def __init__(self, path='Data/.cache/selector_stats.sqlite', min_successes=3, min_rate=0.9):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.min_successes = min_successes
+        self.min_rate = min_rate
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS selector_stats ('
+            ' domain TEXT, selector TEXT, successes INTEGER, failures INTEGER,'
+            ' paragraphs INTEGER, seconds REAL, PRIMARY KEY (domain, selector))')
+        self._db.commit()
+
+    def record(self, domain, selector, success, paragraphs=0, seconds=0.0):
+        """
+        Record the outcome of one selector probe.
+
+        Args:
+            domain (str): Domain from `domain_of`.
+            selector (tuple): Selenium (By, value) locator that was tried.
+            success (bool): Whether it yielded article paragraphs.
+            paragraphs (int): Number of paragraphs found.
+            seconds (float): Time spent waiting and extracting.
+        """
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO selector_stats VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (domain, selector) DO UPDATE SET '
+                ' successes = successes + excluded.successes, failures = failures + excluded.failures,'
+                ' paragraphs = paragraphs + excluded.paragraphs, seconds = seconds + excluded.seconds',
+                (domain, selector_key(selector), int(success), int(not success), paragraphs, seconds))
+            self._db.commit()
+
+    def _rows(self, domain):
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT selector, successes, failures, seconds FROM selector_stats WHERE domain=?',
+                (domain,)).fetchall()
+        return {selector: (successes, failures, seconds) for selector, successes, failures, seconds in rows}
+
+    def ranked(self, domain, selectors):
+        """
+        Order selectors by how likely they are to succeed on a domain.
+
+        Selectors are sorted by smoothed success rate, then by mean probe time;
+        ties (including selectors with no history) keep their original order.
+
+        Args:
+            domain (str): Domain from `domain_of`.
+            selectors (list): Selenium (By, value) locators.
+
+        Returns:
+            list: The same selectors, reordered.
+        """
+        rows = self._rows(domain)
+
+        def score(selector):
+            successes, failures, seconds = rows.get(selector_key(selector), (0, 0, 0.0))
+            tries = successes + failures
+            rate = (successes + 1) / (tries + 2)
+            return (-rate, seconds / tries if tries else 0.0)
+
+        return sorted(selectors, key=score)
+
+    def pinned(self, domain, selectors):
+        """
+        Return the selector that has proven reliable on a domain, if any.
+
+        Args:
+            domain (str): Domain from `domain_of`.
+            selectors (list): Candidate Selenium (By, value) locators.
+
+        Returns:
+            tuple or None: The pinned locator, or None if no selector qualifies.
+        """
+        rows = self._rows(domain)
+        best, best_successes = None, 0
+        for selector in selectors:
+            successes, failures, _ = rows.get(selector_key(selector), (0, 0, 0.0))
+            if successes >= self.min_successes and successes / (successes + failures) >= self.min_rate \
+                    and successes > best_successes:
+                best, best_successes = selector, successes
+        return best
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,280 @@
+import hashlib
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from tqdm import tqdm
+
+from GPT_RAND import respond
+from article_cache import ArticleCache
+from metrics import metrics
+from dedupe import DedupeIndex, find_duplicates
+
+# GPT request timings, retries and token usage go to the same collector as scraping
+respond.metrics = metrics
+
+# Prompt used to summarize every article
+summary_context = '''
+    Be direct. Very succinctly summarize the incident that occured in the following article, at a high-level, making sure to include all the relevant facts, entities, locations, actions and times that are relevant to the violent incident.
+    You do not necessarily need to shorten it if it is already pretty breif. You do not need to capture the articles intent, perspective or tone, just mostly the facts of the occurence. 
+    '''
+
+# Model settings passed to respond.Summarize; part of the summary cache key
+summary_params = dict(T=.3, C=1, N=1, GPT='4om')
+
+# Articles estimated above this many tokens are chunked and map-reduce summarized
+long_article_tokens = 6000
+
+# Seconds to wait for one GPT response
+request_timeout = 60
+
+# Articles at least this similar (estimated Jaccard over word shingles) share one summary; None disables
+dedupe_threshold = 0.8
+
+def configure(model=None, timeout=None, dedupe=None, rpm=None, tpm=None):
+    """
+    Override the model, request timeout, duplicate threshold and rate limits used for summarization.
+
+    Args:
+        model (str or None): Key of `respond.Deployment`, e.g. '4om'.
+        timeout (float or None): Seconds to wait for one GPT response.
+        dedupe (float or None): Similarity at which articles share a summary (`dedupe_threshold`);
+            0 disables deduplication.
+        rpm (int or None): Requests-per-minute limit of the shared `respond.limiter`.
+        tpm (int or None): Tokens-per-minute limit of the shared `respond.limiter`.
+    """
+    global request_timeout, dedupe_threshold
+    if model is not None:
+        if model not in respond.Deployment:
+            raise ValueError(f"Unknown model {model!r}; expected one of {', '.join(respond.Deployment)}")
+        summary_params['GPT'] = model
+    if timeout is not None:
+        request_timeout = timeout
+    if dedupe is not None:
+        dedupe_threshold = dedupe or None
+    if rpm is not None or tpm is not None:
+        respond.limiter.configure(rpm, tpm)
+
+def summary_cache_key(article):
+    """
+    Build the summary cache key for an article under the current prompt and model settings.
+
+    Args:
+        article (str): Article text.
+
+    Returns:
+        str: Cache key.
+    """
+    return ArticleCache.summary_key(article, summary_context, summary_params['GPT'],
+                                    summary_params['T'], summary_params['C'])
+
+def prompt_fingerprint():
+    """
+    Hash the prompt and model settings that every summary depends on.
+
+    Returns:
+        str: Hex digest; it changes whenever `summary_context` or `summary_params` change.
+    """
+    payload = json.dumps([summary_context, summary_params], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def summarize_article(article, debug=False, cache=None, long_workers=4):
+    """
+    Summarize a single article with `respond.Summarize`.
+
+    Args:
+        article (str): Article text.
+        debug (bool): If True, print debug information.
+        cache (ArticleCache or None): If set, cached summaries are reused and new ones stored.
+        long_workers (int): Chunk requests in flight if the article is long enough to be map-reduced.
+
+    Returns:
+        str or None: The summary, or None if summarization failed.
+    """
+    if cache:
+        summary = cache.get_summary(summary_cache_key(article))
+        if summary is not None:
+            return summary
+    try:
+        with metrics.timer('summarize'):
+            if respond.estimate_tokens(article) > long_article_tokens:
+                summary = summarize_long_article(article, cache, long_workers)
+            else:
+                summary = respond.Summarize(article, context=summary_context, print_rslt=False,
+                                             timeout=request_timeout, **summary_params)
+    except Exception as e:
+        tqdm.write(f"[ERROR] Error summarizing {article}: {e}")
+        return None
+    if debug:
+        print(article)
+        print(''.join(['#']*80))
+        print(summary)
+    if cache:
+        cache.put_summary(summary_cache_key(article), summary[0])
+    return summary[0]
+
+def summarize_long_article(article, cache=None, workers=4):
+    """
+    Summarize an article too long for one request with `respond.SummarizeLong`.
+
+    The article is split on paragraph boundaries, the chunks are summarized
+    concurrently and then merged. Chunk summaries are cached, so a failed
+    merge does not redo them.
+
+    Args:
+        article (str): Article text.
+        cache (ArticleCache or None): Cache for the per-chunk summaries.
+        workers (int): Chunk and merge requests in flight.
+
+    Returns:
+        list: The summary, as a one-element list like `respond.Summarize`.
+    """
+    return respond.SummarizeLong(article, context=summary_context, T=summary_params['T'], C=summary_params['C'],
+                                 GPT=summary_params['GPT'], chunk_tokens=long_article_tokens // 2, max_workers=workers,
+                                 cache=cache, timeout=request_timeout)
+
+def _record_duplicates(exact, near):
+    metrics.incr('dedupe_exact', exact)
+    metrics.incr('dedupe_near', near)
+    metrics.incr('gpt_calls_saved', exact + near)
+
+def deduped_summarizer(debug=False, cache=None):
+    """
+    Build a thread-safe `summarize(key, article)` that summarizes duplicate articles once.
+
+    Each article is checked against every article seen before by this summarizer.
+    The first of a group of exact or near duplicates is summarized; later ones wait
+    for and reuse its summary (and are summarized themselves if it failed). Used
+    where articles arrive one at a time, e.g. the streaming pipeline.
+
+    Args:
+        debug (bool): If True, print debug information.
+        cache (ArticleCache or None): If set, cached summaries are reused and new ones stored,
+            including reused summaries under each duplicate's own key.
+
+    Returns:
+        callable: summarize(key, article) -> summary or None; keys must be unique.
+    """
+    if dedupe_threshold is None:
+        return lambda key, article: summarize_article(article, debug, cache)
+    index = DedupeIndex(threshold=dedupe_threshold)
+    futures = {}
+    lock = threading.Lock()
+
+    def future_for(key):
+        with lock:
+            return futures.setdefault(key, Future())
+
+    def summarize(key, article):
+        rep, kind = index.add(key, article)
+        if rep is None:
+            summary = None
+            try:
+                summary = summarize_article(article, debug, cache)
+            finally:
+                future_for(key).set_result(summary)
+            return summary
+        summary = future_for(rep).result()
+        if summary is None:
+            return summarize_article(article, debug, cache)
+        _record_duplicates(kind == 'exact', kind == 'near')
+        if debug: print(f"[DEBUG] Reusing the summary of a {kind} duplicate article.")
+        if cache:
+            cache.put_summary(summary_cache_key(article), summary)
+        return summary
+
+    return summarize
+
+def articles_summarization(articles, debug=False, concurrency=8, rpm=None, tpm=None, cache=None, batch_tokens=None,
+                           dedupe=True):
+    """
+    Summarize a list of articles using the GPT_RAND.respond.Summarize function.
+
+    Args:
+        articles (list): List of article texts.
+        debug (bool): If True, print debug information.
+        concurrency (int): Maximum summarization requests in flight. If 1, articles
+            are summarized one at a time with `respond.Summarize`.
+        rpm (int or None): Requests-per-minute limit; retunes the shared `respond.limiter` (see `configure`).
+        tpm (int or None): Tokens-per-minute limit; retunes the shared `respond.limiter` (see `configure`).
+        cache (ArticleCache or None): If set, cached summaries are reused and new ones stored.
+        batch_tokens (int or None): If set, concurrent summarization packs short articles
+            into shared requests of up to this many estimated tokens; articles whose
+            batched answer cannot be parsed are retried on their own.
+        dedupe (bool): If True, exact and near-duplicate articles (see `dedupe_threshold`)
+            are summarized once and the summary is copied to the others.
+
+    Returns:
+        list: List of summaries, in input order.
+    """
+    if dedupe and dedupe_threshold is not None and len(articles) > 1:
+        return _summarize_representatives(articles, debug, concurrency, rpm, tpm, cache, batch_tokens)
+
+    summaries = [None]*len(articles)
+
+    if concurrency and concurrency > 1:
+        todo, long = [], []
+        for j, article in enumerate(articles):
+            if not article:
+                continue
+            summaries[j] = cache.get_summary(summary_cache_key(article)) if cache else None
+            if summaries[j] is None and respond.estimate_tokens(article) > long_article_tokens:
+                long.append(j)
+            elif summaries[j] is None:
+                todo.append(j)
+        # Long articles are map-reduced on side threads while the short ones go through SummarizeMany.
+        # Up to half of `concurrency` goes to their chunk requests and is taken out of SummarizeMany's
+        # share, so no more than `concurrency` requests are in flight; rpm/tpm apply to both through
+        # the shared respond.limiter.
+        threads = min(len(long), max(1, concurrency // 2))
+        per_thread = max(1, (concurrency // 2) // threads) if long else 0
+        if rpm or tpm:
+            respond.limiter.configure(rpm, tpm)
+        with ThreadPoolExecutor(max_workers=max(1, threads)) as executor:
+            pending = {j: executor.submit(summarize_article, articles[j], debug, cache, per_thread) for j in long}
+            with tqdm(total=len(todo), desc='Summarizing articles') as pbar, \
+                    metrics.timer('summarize_batch', size=len(todo)):
+                results = respond.SummarizeMany([articles[j] for j in todo], context=summary_context,
+                                                **summary_params, max_in_flight=concurrency - threads * per_thread,
+                                                rpm=rpm, tpm=tpm,
+                                                on_done=pbar.update, batch_tokens=batch_tokens,
+                                                timeout=request_timeout)
+            for j, future in pending.items():
+                summaries[j] = future.result()
+        for j, summary in zip(todo, results):
+            if isinstance(summary, Exception):
+                tqdm.write(f"[ERROR] Error summarizing {articles[j]}: {summary}")
+                continue
+            summaries[j] = summary[0]
+            if cache:
+                cache.put_summary(summary_cache_key(articles[j]), summary[0])
+            if debug:
+                print(articles[j])
+                print(''.join(['#']*80))
+                print(summary)
+        return summaries
+
+    for j, article in enumerate(tqdm(articles, desc='Summarizing articles')):
+        if article: 
+            summaries[j] = summarize_article(article, debug, cache)
+    return summaries
+
+def _summarize_representatives(articles, debug, concurrency, rpm, tpm, cache, batch_tokens):
+    """Summarize one article per duplicate cluster and copy its summary to the rest of the cluster."""
+    with metrics.timer('dedupe', size=len(articles)):
+        representatives, counts = find_duplicates(articles, threshold=dedupe_threshold)
+    unique = [j for j, rep in enumerate(representatives) if rep == j]
+    saved = counts['exact'] + counts['near']
+    if saved:
+        _record_duplicates(counts['exact'], counts['near'])
+        tqdm.write(f"[DEDUPE] {len(articles)} articles -> {len(unique)} to summarize; {saved} GPT calls saved "
+                   f"({counts['exact']} exact, {counts['near']} near duplicates)")
+    results = articles_summarization([articles[j] for j in unique], debug, concurrency, rpm, tpm, cache, batch_tokens,
+                                     dedupe=False)
+    by_rep = dict(zip(unique, results))
+    summaries = [None if rep is None else by_rep[rep] for rep in representatives]
+    if cache:
+        for j, rep in enumerate(representatives):
+            if rep is not None and rep != j and summaries[j] is not None:
+                cache.put_summary(summary_cache_key(articles[j]), summaries[j])
+    return summaries
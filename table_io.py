@@ -0,0 +1,294 @@
+import csv
+import itertools
+import os
+
+import pandas as pd
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.xlsx', '.xlsm'):
+        return 'xlsx'
+    if ext in ('.csv', '.parquet'):
+        return ext[1:]
+    raise ValueError(f"Unsupported table format: {path}")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet input/output needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def read_chunks(path, chunk_rows=5000, start=0, stop=None):
+    """
+    Stream a table from disk as DataFrames of at most `chunk_rows` rows.
+
+    Excel files are read with openpyxl in read-only mode, CSV with pandas'
+    chunked reader and Parquet by record batch, so memory stays bounded by
+    the chunk size rather than the file size. Chunks carry a continuous
+    RangeIndex, so row labels match those of a whole-file `pd.read_excel`.
+
+    Args:
+        path (str): .xlsx, .csv or .parquet file.
+        chunk_rows (int): Maximum rows per chunk.
+        start (int): First data row to return.
+        stop (int or None): Row to stop before; None reads to the end.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the table.
+    """
+    fmt = _format(path)
+    if fmt == 'xlsx':
+        chunks = _read_xlsx(path, chunk_rows)
+    elif fmt == 'csv':
+        chunks = pd.read_csv(path, chunksize=chunk_rows)
+    else:
+        parquet = _pyarrow().parquet.ParquetFile(path)
+        chunks = (batch.to_pandas() for batch in parquet.iter_batches(batch_size=chunk_rows))
+
+    offset = 0
+    for chunk in chunks:
+        lo, hi = offset, offset + len(chunk)
+        offset = hi
+        if hi <= start:
+            continue
+        if stop is not None and lo >= stop:
+            break
+        chunk.index = pd.RangeIndex(lo, hi)
+        chunk = chunk.loc[max(lo, start):(hi if stop is None else min(hi, stop)) - 1]
+        if len(chunk):
+            yield chunk
+    if hasattr(chunks, 'close'):
+        chunks.close()
+
+
+def _read_xlsx(path, chunk_rows):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        # Unnamed header cells get pandas-style names
+        columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+        while True:
+            block = list(itertools.islice(rows, chunk_rows))
+            if not block:
+                return
+            yield pd.DataFrame.from_records(block, columns=columns)
+    finally:
+        workbook.close()
+
+
+def read_table(path, start=0, stop=None):
+    """
+    Read a whole table (or a row range of it) with the streaming readers.
+
+    Args:
+        path (str): .xlsx, .csv or .parquet file.
+        start (int): First data row to return.
+        stop (int or None): Row to stop before; None reads to the end.
+
+    Returns:
+        pd.DataFrame: The rows, indexed by their position in the file.
+    """
+    chunks = list(read_chunks(path, start=start, stop=stop))
+    return pd.concat(chunks) if chunks else pd.DataFrame()
+
+
+class TableWriter:
+    """
+    Append DataFrame chunks to an .xlsx, .csv or .parquet file.
+
+    Excel output uses an openpyxl write-only workbook and Parquet a pyarrow
+    ParquetWriter, so rows already written are not kept in memory. Excel and
+    Parquet files are only complete once the writer is closed.
+
+    Args:
+        path (str): Output file; its extension selects the format.
+    """
+
+    def __init__(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.format = _format(path)
+        self.rows = 0
+        self._columns = None
+        self._file = self._sheet = self._writer = self._schema = None
+        if self.format == 'xlsx':
+            from openpyxl import Workbook
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet()
+        elif self.format == 'csv':
+            self._file = open(path, 'w', newline='', encoding='utf-8')
+            self._csv = csv.writer(self._file)
+
+    def write(self, df):
+        """Append the rows of `df`; the first chunk's columns become the header."""
+        if self._columns is None:
+            self._columns = list(df.columns)
+            if self._sheet is not None:
+                self._sheet.append(self._columns)
+            elif self._file is not None:
+                self._csv.writerow(self._columns)
+        df = df[self._columns]
+        if self.format == 'parquet':
+            self._write_parquet(df)
+        else:
+            # Empty cells are written as blanks, not 'nan'
+            values = df.astype(object).where(df.notna(), None)
+            append = self._sheet.append if self._sheet is not None else self._csv.writerow
+            for row in values.itertuples(index=False, name=None):
+                append(row)
+        self.rows += len(df)
+
+    def _write_parquet(self, df):
+        pa = _pyarrow()
+        # Text columns are stored as strings so an all-empty chunk cannot change the schema
+        df = df.astype({name: 'string' for name in df.columns if df[name].dtype == object})
+        if self._writer is None:
+            self._schema = pa.Schema.from_pandas(df, preserve_index=False)
+            self._writer = pa.parquet.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        if self.format == 'xlsx':
+            self._workbook.save(self.path)
+        elif self.format == 'csv':
+            self._file.close()
+        elif self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def temp_path(path, tag='tmp'):
+    """Sibling path for writing `path` before moving it into place, e.g. out.tmp.xlsx."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{tag}{ext}"
+
+
+def copy_with_column(src, dst, column, values, start=0, stop=None, chunk_rows=5000):
+    """
+    Copy a table chunk by chunk, filling one column from a mapping of row labels.
+
+    Only one chunk is held in memory. The copy is written next to `dst` and then
+    moved over it, so a crash mid-write leaves the previous `dst` intact.
+
+    Args:
+        src (str): Input .xlsx, .csv or .parquet file.
+        dst (str): Output file; its extension selects the format.
+        column (str): Column to fill; added if the input lacks it.
+        values (dict): Row label -> value; rows not in it keep their input value.
+        start (int): First data row to copy.
+        stop (int or None): Row to stop before; None copies to the end.
+        chunk_rows (int): Rows read and written at a time.
+    """
+    tmp = temp_path(dst)
+    with TableWriter(tmp) as writer:
+        for chunk in read_chunks(src, chunk_rows, start=start, stop=stop):
+            if column not in chunk:
+                chunk[column] = None
+            elif chunk[column].dtype != object:
+                chunk[column] = chunk[column].astype(object)
+            labels = [label for label in chunk.index if label in values]
+            if labels:
+                chunk.loc[labels, column] = pd.Series([values[label] for label in labels], index=labels, dtype=object)
+            writer.write(chunk)
+    os.replace(tmp, dst)
+
+
+def write_table(df, path):
+    """
+    Write a whole DataFrame with the streaming writers.
+
+    Args:
+        df (pd.DataFrame): Table to write.
+        path (str): Output .xlsx, .csv or .parquet file.
+    """
+    with TableWriter(path) as writer:
+        writer.write(df)
+
+
+def count_rows(path):
+    """Number of data rows in a table, read from metadata where the format has it."""
+    fmt = _format(path)
+    if fmt == 'xlsx':
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            sheet = workbook.active
+            # Files without a stored dimension report no size; count them instead
+            if sheet.max_row is None:
+                sheet.reset_dimensions()
+                return sum(1 for _ in sheet.iter_rows(min_row=2, values_only=True))
+            return max(sheet.max_row - 1, 0)
+        finally:
+            workbook.close()
+    if fmt == 'parquet':
+        return _pyarrow().parquet.ParquetFile(path).metadata.num_rows
+    return sum(len(chunk) for chunk in read_chunks(path))
+
+
+def patch_table(path, rows, columns):
+    """
+    Update some cells of an existing table in place.
+
+    For Excel files only the given cells are rewritten through openpyxl, so the
+    rest of the workbook (including formatting) is left as it was. CSV and
+    Parquet have no cell-level updates and are rewritten. Rows past the end of
+    the table are appended with all their columns.
+
+    Args:
+        path (str): Existing .xlsx, .csv or .parquet file.
+        rows (pd.DataFrame): Rows to write, indexed by their position in the file.
+        columns (list): Columns to write for rows that already exist; missing columns are added.
+    """
+    if rows.empty:
+        return
+    values = rows.astype(object).where(rows.notna(), None)
+    if _format(path) != 'xlsx':
+        df = read_table(path)
+        existing = values.index[values.index < len(df)]
+        for column in columns:
+            if column not in df:
+                df[column] = None
+            elif df[column].dtype != object:
+                df[column] = df[column].astype(object)
+            df.loc[existing, column] = values.loc[existing, column]
+        df = pd.concat([df, values.loc[values.index >= len(df)]])
+        tmp = temp_path(path)
+        write_table(df, tmp)
+        os.replace(tmp, path)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path)
+    sheet = workbook.active
+    header = [cell.value for cell in sheet[1]]
+    for column in set(columns) | set(values.columns):
+        if column not in header:
+            header.append(column)
+            sheet.cell(row=1, column=len(header), value=column)
+    position = {name: i + 1 for i, name in enumerate(header)}
+    last = sheet.max_row - 1
+    for label, row in values.iterrows():
+        # Row labels are 0-based positions below the header row
+        for column in (columns if label < last else values.columns):
+            sheet.cell(row=int(label) + 2, column=position[column], value=row[column])
+    tmp = temp_path(path)
+    workbook.save(tmp)
+    os.replace(tmp, path)
@@ -0,0 +1,217 @@
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing.util import Finalize
+
+import pandas as pd
+from tqdm import tqdm
+
+import scrape_and_summ as ss
+import summarization
+from article_cache import ArticleCache
+from driver_pool import DriverPool
+from job_journal import JobJournal
+from metrics import metrics
+from selector_stats import SelectorStats
+import table_io
+
+# Per-process state, created by _init_worker in each pool process
+_worker = {}
+
+
+def _init_worker(cache_path, stats_path, debug, http_first, max_pages, concurrency, settings):
+    """Give each worker process its own Chrome driver and cache connections."""
+    # Spawned processes re-import the modules, so overrides made in the parent must be reapplied.
+    ss.configure(**(settings or {}))
+    pool = DriverPool(1, ss.chrome_options(), max_pages=max_pages, debug=debug)
+    cache = ArticleCache(cache_path) if cache_path else None
+    stats = SelectorStats(stats_path) if stats_path else None
+    # Finalizers run when the pool shuts the process down; atexit hooks do not.
+    Finalize(pool, pool.close, exitpriority=10)
+    if cache is not None:
+        Finalize(cache, cache.close, exitpriority=5)
+    if stats is not None:
+        Finalize(stats, stats.close, exitpriority=5)
+    # Duplicate articles are summarized once per process, across all the chunks it handles
+    summarize = summarization.deduped_summarizer(debug, cache)
+    # Politeness limits and backoff per domain, kept across the chunks this process handles
+    domains = ss.domain_scheduler()
+    _worker.update(pool=pool, cache=cache, stats=stats, debug=debug, http_first=http_first, concurrency=concurrency,
+                   summarize=summarize, domains=domains)
+
+
+def _process_chunk(items):
+    """
+    Scrape and summarize a chunk of rows inside a worker process.
+
+    Args:
+        items (list): (slot, url) tuples, one per distinct URL.
+
+    Returns:
+        tuple: (list of (slot, whether article text was found, summary or None),
+        metrics snapshot for the chunk).
+    """
+    pool, cache, debug, summarize = _worker['pool'], _worker['cache'], _worker['debug'], _worker['summarize']
+    domains = _worker['domains']
+    for item in items:
+        domains.put(item, item[1])
+    # Taken in domain-interleaved order, so one site's cool-down does not stall the chunk
+    items, articles = [], []
+    while True:
+        item = domains.take()
+        if item is None:
+            break
+        items.append(item)
+        try:
+            articles.append(ss._scrape_pooled(pool, item[1], debug, _worker['http_first'], cache, _worker['stats'],
+                                              domains))
+        except Exception as e:
+            print(f"[ERROR] Error scraping {item[1]}: {e}")
+            articles.append(None)
+    with ThreadPoolExecutor(max_workers=_worker['concurrency']) as executor:
+        summaries = list(executor.map(
+            lambda slot, article: summarize(slot, article) if article else None, [slot for slot, _ in items], articles))
+    results = [(slot, bool(article), summary) for (slot, _), article, summary in zip(items, articles, summaries)]
+    return results, metrics.drain()
+
+
+def _interleave(per_file):
+    """Round-robin rows across files so no single workbook monopolizes the queue."""
+    merged = itertools.zip_longest(*per_file)
+    return [item for group in merged for item in group if item is not None]
+
+
+def run_workbooks(excel_files, output_dir, processes=4, chunk_size=8, url_col='Source_coding_info',
+                  sum_col='Case_summary', overwrite=False, cache_path=None, stats_path=None, journal_dir=None, resume=False,
+                  flush_every=50, concurrency=8, max_pages=50, http_first=True, start=0, stop=None, output_format=None,
+                  settings=None, chunk_rows=5000, debug=False):
+    """
+    Scrape and summarize every workbook through one global, process-parallel work queue.
+
+    Pending rows from all workbooks are reduced to distinct URLs, interleaved and
+    split into chunks that a pool of worker processes picks up; each worker owns
+    one Chrome driver. A URL listed on several rows, in one workbook or across
+    several, is fetched and summarized once and its result fanned out to every
+    row. A workbook's output is written as soon as its last row finishes.
+
+    Workbooks are read in chunks and only the URLs to process and the finished
+    summaries are kept; each output is written by streaming its input again
+    with the summaries filled in, so memory does not grow with the other columns.
+
+    Args:
+        excel_files (list): Paths of the input workbooks (.xlsx, .csv or .parquet).
+        output_dir (str): Directory for the *_summary_appended outputs.
+        processes (int): Number of worker processes.
+        chunk_size (int): Rows handed to a worker at a time.
+        url_col (str): Column name containing URLs.
+        sum_col (str): Column name for summaries.
+        overwrite (bool): If True, overwrite existing summaries.
+        cache_path (str or None): ArticleCache file shared by all workers.
+        stats_path (str or None): SelectorStats file shared by all workers.
+        journal_dir (str or None): Directory for per-workbook job journals.
+        resume (bool): If True, skip rows the journals mark as summarized.
+        flush_every (int): Finished rows of a workbook before its first interim write; each
+            later one waits until the finished count has doubled. The journal records every
+            finished row in between.
+        concurrency (int): Summarization requests in flight per worker.
+        max_pages (int): Pages a worker's driver serves before it is recycled.
+        http_first (bool): If True, try a plain HTTP fetch before using Chrome.
+        start (int): First data row of each workbook to read.
+        stop (int or None): Row to stop reading before; None reads to the end.
+        output_format (str or None): 'xlsx', 'csv' or 'parquet'; None keeps each input's format.
+        settings (dict or None): Keyword arguments for `scrape_and_summ.configure` in each worker
+            (model, timeout, page_timeout, dedupe, lean, rpm, tpm).
+        chunk_rows (int): Rows read and written at a time.
+        debug (bool): If True, print debug information.
+
+    Returns:
+        list: Paths of the written output files.
+    """
+    summaries, outputs, journals, remaining, totals, per_file = [], [], [], [], [], []
+    # slot -> (file index, row label) pairs sharing one distinct URL
+    targets, slots = [], {}
+    for file_idx, file_path in enumerate(excel_files):
+        name, ext = os.path.splitext(os.path.basename(file_path))
+        if output_format:
+            ext = '.' + output_format
+        journal = JobJournal(os.path.join(journal_dir, f"{name}.jsonl"), resume=resume) if journal_dir else None
+        finished = journal.completed() if journal is not None else {}
+        # Only the URLs to process are kept; outputs are streamed from the input again when written
+        pending, filled = [], {}
+        for df in table_io.read_chunks(file_path, chunk_rows, start=start, stop=stop):
+            _, urls = ss.select_rows(df, url_col, sum_col, mask=ss.search_mask(df), overwrite=overwrite)
+            resumed = urls.index[urls.index.isin(list(finished))]
+            filled.update((label, finished[label]) for label in resumed)
+            pending.append(urls.drop(resumed))
+        urls = pd.concat(pending) if pending else pd.Series(dtype=object)
+        unique, groups = ss.plan_work(urls, debug)
+        items = []
+        for url, labels in zip(unique, groups):
+            if url not in slots:
+                slots[url] = len(targets)
+                targets.append([])
+                items.append((slots[url], url))
+            targets[slots[url]].extend((file_idx, label) for label in labels)
+        summaries.append(filled)
+        outputs.append(os.path.join(output_dir, f"{name}_summary_appended{ext}"))
+        journals.append(journal)
+        remaining.append(sum(len(labels) for labels in groups))
+        totals.append(remaining[-1])
+        per_file.append(items)
+
+    written = []
+    next_flush = [flush_every] * len(excel_files)
+
+    def write(file_idx):
+        table_io.copy_with_column(excel_files[file_idx], outputs[file_idx], sum_col, summaries[file_idx],
+                                  start=start, stop=stop, chunk_rows=chunk_rows)
+
+    def finish(file_idx):
+        write(file_idx)
+        if journals[file_idx] is not None:
+            journals[file_idx].close()
+        written.append(outputs[file_idx])
+        tqdm.write(f"Processed and saved: {outputs[file_idx]}")
+
+    for file_idx, count in enumerate(remaining):
+        if count == 0:
+            finish(file_idx)
+
+    work = _interleave(per_file)
+    chunks = [work[i:i + chunk_size] for i in range(0, len(work), chunk_size)]
+    if not chunks:
+        return written
+
+    initargs = (cache_path, stats_path, debug, http_first, max_pages, concurrency, settings)
+    # spawn keeps each worker free of the parent's threads and open handles.
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                             initializer=_init_worker, initargs=initargs) as executor, \
+            tqdm(total=len(work), desc="Scraping and summarizing") as pbar:
+        futures = {executor.submit(_process_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                results, snapshot = future.result()
+                metrics.merge(snapshot)
+            except Exception as e:
+                tqdm.write(f"[ERROR] Worker failed on a chunk: {e}")
+                results = [(slot, False, None) for slot, _ in futures[future]]
+            for slot, scraped, summary in results:
+                for file_idx, label in targets[slot]:
+                    summaries[file_idx][label] = summary
+                    journal = journals[file_idx]
+                    if journal is not None:
+                        journal.record(label, 'scrape', 'ok' if scraped else 'failed')
+                        journal.record(label, 'summary', 'ok' if summary is not None else 'failed', summary=summary)
+                    remaining[file_idx] -= 1
+                    if remaining[file_idx] == 0:
+                        finish(file_idx)
+                    elif totals[file_idx] - remaining[file_idx] >= next_flush[file_idx]:
+                        write(file_idx)
+                        # Each interim write waits for twice as many finished rows, so a workbook
+                        # is rewritten O(log n) times rather than n / flush_every times
+                        done = totals[file_idx] - remaining[file_idx]
+                        next_flush[file_idx] = max(2 * done, done + flush_every)
+            pbar.update(len(results))
+    return written